@@ -1,4 +1,5 @@
 from app import create_app, db
+from app.services.search_service import SearchService
 from flask import jsonify
 
 app = create_app()
@@ -21,4 +22,5 @@ def health_check():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        SearchService.ensure_index()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
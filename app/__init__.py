@@ -16,6 +16,10 @@ def create_app(config_class=Config):
     jwt.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
+    # Parse the caller's entitlements once per request (available as g.entitlements)
+    from app.utils.entitlements import load_request_entitlements
+    app.before_request(load_request_entitlements)
+    
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.templates import templates_bp
@@ -35,4 +39,13 @@ def create_app(config_class=Config):
     app.register_blueprint(template_audit_bp, url_prefix='/api/audit')
     app.register_blueprint(email_generation_bp, url_prefix='/api/email')
     
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # Optionally drain the email outbox from this process
+    if app.config.get('OUTBOX_WORKERS_AUTOSTART'):
+        from app.services.outbox_service import OutboxWorkerPool
+        app.extensions['outbox_worker_pool'] = OutboxWorkerPool(app).start()
+    
     return app
\ No newline at end of file
@@ -0,0 +1,60 @@
+from flask import current_app
+from flask.cli import with_appcontext
+import click
+
+@click.command('outbox-worker')
+@with_appcontext
+@click.option('--workers', type=int, default=None, help='Number of worker threads (default: OUTBOX_WORKERS)')
+@click.option('--batch-size', type=int, default=None, help='Rows claimed per Graph $batch call (default: OUTBOX_BATCH_SIZE)')
+def outbox_worker_command(workers, batch_size):
+    """Drain the email outbox to Microsoft Graph until interrupted"""
+    from app.services.outbox_service import OutboxWorkerPool
+
+    pool = OutboxWorkerPool(current_app._get_current_object(), workers=workers, batch_size=batch_size).start()
+    click.echo(f'Outbox worker pool started with {pool.workers} workers')
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        click.echo('Stopping outbox workers...')
+        pool.stop()
+
+@click.command('search-rebuild')
+@with_appcontext
+def search_rebuild_command():
+    """Create the template search index if needed and re-index every template"""
+    from app.services.search_service import SearchService
+
+    indexed = SearchService.rebuild()
+    click.echo(f'Indexed {indexed} templates with the {SearchService.backend().name} search backend')
+
+@click.command('index-advisor')
+@click.option('--application', 'applications', multiple=True, help='Application in the template scope (repeatable; default: active applications)')
+@click.option('--verbose', is_flag=True, help='Print the full plan for every access path')
+@click.option('--fail-on-scan', is_flag=True, help='Exit with status 1 if any access path does a full scan')
+@with_appcontext
+def index_advisor_command(applications, verbose, fail_on_scan):
+    """Capture query plans for the template, log and audit access paths and flag scans"""
+    from app.services.index_advisor import IndexAdvisor
+
+    try:
+        results = IndexAdvisor.report(list(applications) or None)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for result in results:
+        status = ', '.join(result['issues']) if result['issues'] else 'ok'
+        click.echo(f"{result['path']:<40} {status}")
+        if verbose or 'full scan' in result['issues']:
+            for line in result['plan']:
+                click.echo(f'    {line}')
+
+    full_scans = [result['path'] for result in results if 'full scan' in result['issues']]
+    click.echo(f'{len(results)} access paths planned, {len(full_scans)} with full scans')
+    if fail_on_scan and full_scans:
+        raise SystemExit(1)
+
+def register_commands(app):
+    """Register the application's flask CLI commands"""
+    app.cli.add_command(outbox_worker_command)
+    app.cli.add_command(search_rebuild_command)
+    app.cli.add_command(index_advisor_command)
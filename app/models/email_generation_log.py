@@ -19,5 +19,12 @@ class EmailGenerationLog(db.Model):
     Status = db.Column(db.String(50), nullable=False, default='SUCCESS')  # 'SUCCESS', 'FAILED', 'PENDING'
     ErrorMessage = db.Column(db.Text, nullable=True)
     
+    __table_args__ = (
+        # Log listings filter by template or status and page newest first
+        db.Index('ix_emailgenerationlog_template_time', 'EmailTemplateId', 'GenerationTime'),
+        db.Index('ix_emailgenerationlog_status_time', 'Status', 'GenerationTime'),
+        db.Index('ix_emailgenerationlog_time', 'GenerationTime', 'LogId'),
+    )
+    
     # Relationship to Template
     template = db.relationship('Template', backref=db.backref('generation_logs', lazy='dynamic'))
\ No newline at end of file
@@ -0,0 +1,27 @@
+from app import db
+from datetime import datetime
+import uuid
+
+class EmailOutbox(db.Model):
+    """Queue of rendered emails waiting to be delivered to Microsoft Graph by the outbox workers"""
+    __tablename__ = 'EmailOutbox'
+
+    OutboxId = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    LogId = db.Column(db.String(36), db.ForeignKey('EmailGenerationLog.LogId'), nullable=False, index=True)
+    Sender = db.Column(db.String(200), nullable=False)
+    Subject = db.Column(db.String(1000), nullable=True)
+    Body = db.Column(db.Text, nullable=True)
+    Recipients = db.Column(db.Text, nullable=False)  # JSON array of recipient emails
+    AutoSend = db.Column(db.Boolean, nullable=False, default=False)
+    AttachmentData = db.Column(db.Text, nullable=True)  # JSON attachment payload, if any
+    Status = db.Column(db.String(20), nullable=False, default='PENDING')  # 'PENDING', 'PROCESSING', 'FAILED'
+    Attempts = db.Column(db.Integer, nullable=False, default=0)
+    AvailableAt = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Not picked up before this time
+    ClaimToken = db.Column(db.String(36), nullable=True, index=True)  # Set by the worker that claimed the row
+    ClaimedAt = db.Column(db.DateTime, nullable=True)
+    CreatedTime = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    ErrorMessage = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_emailoutbox_status_available', 'Status', 'AvailableAt'),
+    )
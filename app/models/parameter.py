@@ -54,7 +54,21 @@ class FormFieldConfiguration(db.Model):
                           name='uq_formfieldconfig_app_field'),
     )
     
-    def to_dict(self):
+    def to_dict(self, options=None, remote_option_count=None):
+        """
+        Serialize the configuration
+        
+        Args:
+            options (list): Pre-loaded active FormFieldOption rows in SortOrder;
+                queried from the options relationship when omitted
+            remote_option_count (int): For fields too large to inline, the number of
+                active options; options are then left out for the UI to page through
+        """
+        if remote_option_count is not None:
+            options = []
+        elif options is None:
+            options = self.options.filter_by(IsActive=True).order_by(FormFieldOption.SortOrder)
+        options = [option.to_dict() for option in options]
         return {
             'Id': self.ConfigId,
             'ApplicationName': self.ApplicationName,
@@ -65,7 +79,9 @@ class FormFieldConfiguration(db.Model):
             'AllowMultiSelect': self.AllowMultiSelect,
             'SortOrder': self.SortOrder,
             'IsActive': self.IsActive,
-            'options': [option.to_dict() for option in self.options.filter_by(IsActive=True).order_by('SortOrder')]
+            'OptionSource': 'remote' if remote_option_count is not None else 'inline',
+            'OptionCount': remote_option_count if remote_option_count is not None else len(options),
+            'options': options
         }
 
 class FormFieldOption(db.Model):
@@ -78,6 +94,11 @@ class FormFieldOption(db.Model):
     SortOrder = db.Column(db.Integer, nullable=False, default=0)
     IsActive = db.Column(db.Boolean, nullable=False, default=True)
     
+    __table_args__ = (
+        # Active options of a field in display order (inline loads and keyset paging)
+        db.Index('ix_formfieldoption_config_active_sort', 'ConfigId', 'IsActive', 'SortOrder', 'OptionId'),
+    )
+    
     def to_dict(self):
         return {
             'Id': self.OptionId,
@@ -6,7 +6,7 @@ class Template(db.Model):
     __tablename__ = 'Templates'
     
     EmailTemplateId = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    ApplicationName = db.Column(db.String(100), nullable=False, index=True)
+    ApplicationName = db.Column(db.String(100), nullable=False)
     SsgTeam = db.Column(db.String(200), nullable=False)
     RecipientType = db.Column(db.String(200), nullable=False)
     TemplateName = db.Column(db.String(200), nullable=False)
@@ -20,20 +20,76 @@ class Template(db.Model):
     ModifiedBy = db.Column(db.String(200), nullable=True)
     ModifiedTime = db.Column(db.DateTime, nullable=True)
     
-    def to_dict(self):
-        return {
-            'Id': self.EmailTemplateId,
-            'ApplicationName': self.ApplicationName,
-            'SsgTeam': self.SsgTeam,
-            'RecipientType': self.RecipientType,
-            'TemplateName': self.TemplateName,
-            'Sender': self.Sender,
-            'Subject': self.Subject,
-            'Body': self.Body,
-            'AutoSend': self.AutoSend,
-            'DataAsAttachment': self.DataAsAttachment,
-            'CreatedBy': self.CreatedBy,
-            'CreationTime': self.CreationTime.isoformat(),
-            'ModifiedBy': self.ModifiedBy,
-            'ModifiedTime': self.ModifiedTime.isoformat() if self.ModifiedTime else None
-        }
\ No newline at end of file
+    __table_args__ = (
+        # Template queries filter on ApplicationName IN (...) and sort newest first by default
+        db.Index('ix_templates_application_creation', 'ApplicationName', 'CreationTime'),
+        db.Index('ix_templates_application_name', 'ApplicationName', 'TemplateName'),
+    )
+    
+    # to_dict() keys and the attributes they are read from, in output order
+    DICT_FIELDS = {
+        'Id': 'EmailTemplateId',
+        'ApplicationName': 'ApplicationName',
+        'SsgTeam': 'SsgTeam',
+        'RecipientType': 'RecipientType',
+        'TemplateName': 'TemplateName',
+        'Sender': 'Sender',
+        'Subject': 'Subject',
+        'Body': 'Body',
+        'AutoSend': 'AutoSend',
+        'DataAsAttachment': 'DataAsAttachment',
+        'CreatedBy': 'CreatedBy',
+        'CreationTime': 'CreationTime',
+        'ModifiedBy': 'ModifiedBy',
+        'ModifiedTime': 'ModifiedTime'
+    }
+    
+    @classmethod
+    def resolve_fields(cls, fields):
+        """
+        Normalize a requested field list (sparse fieldset) to to_dict() keys
+        
+        Args:
+            fields: Comma-separated string or list of to_dict() keys (case-insensitive)
+            
+        Returns:
+            list: Keys in output order, or None if no projection was requested
+            
+        Raises:
+            ValueError: If a field is unknown
+        """
+        if not fields:
+            return None
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        
+        lookup = {key.lower(): key for key in cls.DICT_FIELDS}
+        requested = set()
+        for field in fields:
+            key = lookup.get(str(field).strip().lower())
+            if key is None:
+                raise ValueError(f"Unknown field '{field}'. Allowed: {', '.join(cls.DICT_FIELDS)}")
+            requested.add(key)
+        
+        return [key for key in cls.DICT_FIELDS if key in requested]
+    
+    @classmethod
+    def load_only_columns(cls, fields):
+        """Column attributes to load for a resolved field list"""
+        return [getattr(cls, cls.DICT_FIELDS[key]) for key in fields]
+    
+    def to_dict(self, fields=None):
+        """
+        Serialize the template
+        
+        Args:
+            fields: Optional list of keys from resolve_fields(); only these
+                attributes are read, so deferred columns stay unloaded
+        """
+        data = {}
+        for key in (fields or self.DICT_FIELDS):
+            value = getattr(self, self.DICT_FIELDS[key])
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[key] = value
+        return data
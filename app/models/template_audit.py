@@ -23,6 +23,12 @@ class TemplateAudit(db.Model):
     IpAddress = db.Column(db.String(45), nullable=True)  # IPv4 or IPv6
     SessionId = db.Column(db.String(100), nullable=True)  # Session identifier
     
+    __table_args__ = (
+        # Audit history by user or template, newest first
+        db.Index('ix_templateaudit_user_time', 'AuditUser', 'AuditTimestamp'),
+        db.Index('ix_templateaudit_template_time', 'EmailTemplateId', 'AuditTimestamp'),
+    )
+    
     def to_dict(self):
         """Convert audit record to dictionary"""
         return {
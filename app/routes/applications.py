@@ -2,19 +2,12 @@ from flask import Blueprint, request, jsonify
 from app.models.application import Application
 from app.models.template import Template
 from app.services.auth_service import AuthService
+from app.utils.entitlements import get_user_entitlements
 from app import db
 from datetime import datetime
 
 applications_bp = Blueprint('applications', __name__)
 
-def get_user_entitlements():
-    """
-    Extract user entitlements from request headers or JWT token
-    For now, return empty list - this should be implemented based on your auth system
-    """
-    # TODO: Implement based on your authentication system
-    return request.headers.get('X-User-Entitlements', '').split(',') if request.headers.get('X-User-Entitlements') else []
-
 @applications_bp.route('/', methods=['GET'])
 def get_applications():
     """Get all applications (admin only)"""
@@ -114,6 +107,7 @@ def create_application():
         
         db.session.add(application)
         db.session.commit()
+        AuthService.invalidate_application_cache()
         
         return jsonify(application.to_dict()), 201
     except Exception as e:
@@ -156,6 +150,7 @@ def update_application(application_name):
         application.ModifiedTime = datetime.utcnow()
         
         db.session.commit()
+        AuthService.invalidate_application_cache()
         
         return jsonify(application.to_dict())
     except Exception as e:
@@ -180,6 +175,7 @@ def delete_application(application_name):
         application.ModifiedTime = datetime.utcnow()
         
         db.session.commit()
+        AuthService.invalidate_application_cache()
         
         return jsonify({'message': 'Application deactivated successfully'})
     except Exception as e:
@@ -204,6 +200,7 @@ def activate_application(application_name):
         application.ModifiedTime = datetime.utcnow()
         
         db.session.commit()
+        AuthService.invalidate_application_cache()
         
         return jsonify(application.to_dict())
     except Exception as e:
@@ -1,24 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, url_for
 from app.models.template import Template
 from app.models.email_generation_log import EmailGenerationLog
+from app.models.email_outbox import EmailOutbox
 from app.services.parameter_service import ParameterService
+from app.services.parameter_registry import ParameterRegistry
+from app.services.template_engine import TemplateEngine
 from app.services.outlook_service import OutlookService
+from app.services.outbox_service import OutboxService
 from app.services.auth_service import AuthService
+from app.services.query_service import QueryService
+from app.utils.entitlements import get_user_entitlements
 from app import db
+from sqlalchemy import and_, or_, func
 import uuid
 from datetime import datetime
 import json
+import csv
+import io
 
 email_generation_bp = Blueprint('email_generation', __name__)
 
-def get_user_entitlements():
-    """
-    Extract user entitlements from request headers or JWT token
-    For now, return empty list - this should be implemented based on your auth system
-    """
-    # TODO: Implement based on your authentication system
-    return request.headers.get('X-User-Entitlements', '').split(',') if request.headers.get('X-User-Entitlements') else []
-
 @email_generation_bp.route('/templates/<template_id>/generate', methods=['POST'])
 def generate_email(template_id):
     """
@@ -33,8 +34,12 @@ def generate_email(template_id):
         },
         "auto_send": false,
         "data_as_attachment": false,
-        "use_parameter_defaults": true
+        "use_parameter_defaults": true,
+        "async": false
     }
+    
+    With "async": true the rendered email is queued in the outbox and 202 is
+    returned immediately; poll GET /logs/<log_id> for the delivery status.
     """
     try:
         user_entitlements = get_user_entitlements()
@@ -62,9 +67,8 @@ def generate_email(template_id):
             return jsonify({'error': 'Recipients list is required'}), 400
         
         # Process email content with parameter substitution
-        content_result = ParameterService.prepare_email_content(
-            template.Subject,
-            template.Body,
+        content_result = ParameterService.prepare_template_content(
+            template,
             parameter_values,
             use_parameter_defaults
         )
@@ -75,13 +79,44 @@ def generate_email(template_id):
             pass
         
         # Prepare attachment data if needed
-        attachment_data = None
-        if data_as_attachment:
-            attachment_data = {
-                'data': parameter_values,
-                'format': 'json',
-                'filename': f'template_data_{template_id}_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.json'
-            }
+        attachment_data = _build_attachment_data(template_id, parameter_values) if data_as_attachment else None
+        
+        # Outbox mode: record a pending log entry and let the workers talk to Graph
+        if _as_bool(data.get('async'), False):
+            log_entry = EmailGenerationLog(
+                LogId=str(uuid.uuid4()),
+                EmailTemplateId=template_id,
+                GeneratedBy=request.headers.get('X-User-ID', 'system'),
+                Recipients=json.dumps(recipients),
+                ParametersUsed=json.dumps(parameter_values),
+                SubjectGenerated=content_result['subject'],
+                AttachmentIncluded=data_as_attachment,
+                AutoSent=auto_send,
+                Status='PENDING'
+            )
+            db.session.add(log_entry)
+            OutboxService.enqueue(
+                log_entry,
+                sender=template.Sender,
+                subject=content_result['subject'],
+                body=content_result['body'],
+                recipients=recipients,
+                auto_send=auto_send,
+                attachment_data=attachment_data
+            )
+            db.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'status': 'PENDING',
+                'log_id': log_entry.LogId,
+                'template_id': template_id,
+                'status_url': url_for('email_generation.get_generation_log', log_id=log_entry.LogId),
+                'parameter_processing': {
+                    'missing_parameters': content_result['missing_parameters'],
+                    'replacement_log': content_result['replacement_log']
+                }
+            }), 202
         
         # Create email draft using Outlook service
         outlook_result = OutlookService.create_draft(
@@ -168,9 +203,290 @@ def generate_email(template_id):
             'error': f'Email generation failed: {error_message}'
         }), 500
 
+@email_generation_bp.route('/templates/<template_id>/generate/batch', methods=['POST'])
+def generate_email_batch(template_id):
+    """
+    Mail-merge: generate one email per parameter row from a single template
+    
+    Accepts either a JSON payload:
+    {
+        "rows": [
+            {"recipients": ["email@example.com"], "parameters": {"ClientName": "John Doe"}}
+        ],
+        "auto_send": false,
+        "data_as_attachment": false,
+        "use_parameter_defaults": true,
+        "async": false
+    }
+    or a multipart upload with a CSV "file" whose "recipients" column holds
+    semicolon-separated addresses and whose other columns are parameter values.
+    The options above may be sent as form fields alongside the file.
+    
+    The template, its compiled form and the parameter definitions are loaded
+    once for the whole batch. Drafts are created through Graph $batch requests
+    in chunks, each taking the access token from its cache so long merges
+    survive token expiry, and each chunk's log entries are committed as soon
+    as Graph has answered for it.
+    With "async": true, or with more than MAIL_MERGE_SYNC_MAX_ROWS rows, every
+    row is queued in the outbox as PENDING and 202 is returned without waiting
+    for Graph.
+    """
+    try:
+        user_entitlements = get_user_entitlements()
+        
+        # Get template
+        template = Template.query.get_or_404(template_id)
+        
+        # Check if user has access to this template's application
+        if not AuthService.has_application_access(user_entitlements, template.ApplicationName, 'read'):
+            return jsonify({'error': 'Access denied to this application'}), 403
+        
+        rows, options, error = _parse_mail_merge_request()
+        if error:
+            return jsonify({'error': error}), 400
+        
+        max_rows = current_app.config.get('MAIL_MERGE_MAX_ROWS', 25000)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'Too many rows. Maximum is {max_rows}'}), 400
+        
+        auto_send = _as_bool(options.get('auto_send'), template.AutoSend)
+        data_as_attachment = _as_bool(options.get('data_as_attachment'), template.DataAsAttachment)
+        use_parameter_defaults = _as_bool(options.get('use_parameter_defaults'), True)
+        # Larger merges go through the outbox so the request never waits on Graph for them
+        use_outbox = _as_bool(options.get('async'), False) or \
+                     len(rows) > current_app.config.get('MAIL_MERGE_SYNC_MAX_ROWS', 100)
+        generated_by = request.headers.get('X-User-ID', 'system')
+        
+        # Compile the template and snapshot parameter definitions once for every row
+        compiled = TemplateEngine.compile_template(template)
+        db_parameters = ParameterRegistry.current().snapshot().parameters
+        
+        results = [None] * len(rows)
+        pending = []
+        # Rendered rows are sent in chunks so memory stays bounded for large merges
+        chunk_size = max(1, current_app.config.get('GRAPH_BATCH_SIZE', 20)) * 5
+        
+        def flush_pending():
+            if use_outbox:
+                outlook_results = [None] * len(pending)
+            else:
+                # The token is read from its cache per chunk, so long merges pick up refreshed tokens
+                outlook_results = OutlookService.create_drafts_batch(
+                    [message for _, _, _, _, message in pending]
+                )
+            for (index, recipients, parameter_values, content_result, message), outlook_result in zip(pending, outlook_results):
+                if outlook_result is None:
+                    log_entry = EmailGenerationLog(
+                        LogId=str(uuid.uuid4()),
+                        EmailTemplateId=template_id,
+                        GeneratedBy=generated_by,
+                        Recipients=json.dumps(recipients),
+                        ParametersUsed=json.dumps(parameter_values),
+                        SubjectGenerated=content_result['subject'],
+                        AttachmentIncluded=data_as_attachment,
+                        AutoSent=auto_send,
+                        Status='PENDING'
+                    )
+                    db.session.add(log_entry)
+                    OutboxService.enqueue(
+                        log_entry,
+                        sender=message['sender'],
+                        subject=message['subject'],
+                        body=message['body'],
+                        recipients=recipients,
+                        auto_send=auto_send,
+                        attachment_data=message['attachment_data']
+                    )
+                    results[index] = {
+                        'row': index,
+                        'success': True,
+                        'status': 'PENDING',
+                        'log_id': log_entry.LogId,
+                        'missing_parameters': content_result['missing_parameters']
+                    }
+                    continue
+                
+                log_entry = EmailGenerationLog(
+                    LogId=str(uuid.uuid4()),
+                    EmailTemplateId=template_id,
+                    GeneratedBy=generated_by,
+                    Recipients=json.dumps(recipients),
+                    ParametersUsed=json.dumps(parameter_values),
+                    SubjectGenerated=content_result['subject'],
+                    AttachmentIncluded=data_as_attachment,
+                    AutoSent=auto_send,
+                    OutlookDraftId=outlook_result.get('draftId') if outlook_result['success'] else None,
+                    Status='SUCCESS' if outlook_result['success'] else 'FAILED',
+                    ErrorMessage=outlook_result.get('error') if not outlook_result['success'] else None
+                )
+                db.session.add(log_entry)
+                
+                results[index] = {
+                    'row': index,
+                    'success': outlook_result['success'],
+                    'log_id': log_entry.LogId,
+                    'draft_id': outlook_result.get('draftId'),
+                    'missing_parameters': content_result['missing_parameters'],
+                    'error': outlook_result.get('error')
+                }
+            pending.clear()
+            # Commit per chunk so drafts already created in Outlook keep their log rows if a later chunk fails
+            db.session.commit()
+        
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                results[index] = {'row': index, 'success': False, 'error': 'Row must be an object'}
+                continue
+            
+            recipients = row.get('recipients')
+            parameter_values = row.get('parameters') or {}
+            
+            if not recipients or not isinstance(recipients, list):
+                results[index] = {'row': index, 'success': False, 'error': 'Recipients list is required'}
+                continue
+            
+            if not isinstance(parameter_values, dict):
+                results[index] = {'row': index, 'success': False, 'error': 'Parameters must be an object'}
+                continue
+            
+            content_result = ParameterService.prepare_compiled_content(
+                compiled.subject,
+                compiled.body,
+                parameter_values,
+                use_parameter_defaults,
+                db_parameters
+            )
+            
+            message = {
+                'sender': template.Sender,
+                'subject': content_result['subject'],
+                'body': content_result['body'],
+                'recipients': recipients,
+                'auto_send': auto_send,
+                'data_as_attachment': data_as_attachment,
+                'attachment_data': _build_attachment_data(template_id, parameter_values) if data_as_attachment else None
+            }
+            pending.append((index, recipients, parameter_values, content_result, message))
+            
+            if len(pending) >= chunk_size:
+                flush_pending()
+        
+        if pending:
+            flush_pending()
+        
+        succeeded = sum(1 for result in results if result['success'])
+        
+        return jsonify({
+            'template_id': template_id,
+            'async': use_outbox,
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        }), 202 if use_outbox else 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Batch email generation failed: {str(e)}'
+        }), 500
+
+def _parse_mail_merge_request():
+    """
+    Read mail-merge rows and options from a JSON body or an uploaded CSV file
+    
+    Returns:
+        tuple: (rows, options, error_message)
+    """
+    upload = request.files.get('file')
+    
+    if upload is None:
+        data = request.get_json(silent=True)
+        if not data:
+            return None, None, 'Request body is required'
+        
+        rows = data.get('rows')
+        if not isinstance(rows, list) or not rows:
+            return None, None, 'Rows list is required'
+        
+        return rows, data, None
+    
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig'))
+        recipients_column = next(
+            (name for name in (reader.fieldnames or []) if name and name.strip().lower() == 'recipients'),
+            None
+        )
+        if recipients_column is None:
+            return None, None, "CSV file must include a 'recipients' column"
+        
+        rows = []
+        for record in reader:
+            recipients = [
+                email.strip()
+                for email in (record.get(recipients_column) or '').replace(',', ';').split(';')
+                if email.strip()
+            ]
+            # Empty cells are treated as not provided so parameter defaults apply
+            parameters = {
+                name.strip(): value
+                for name, value in record.items()
+                if name and name != recipients_column and value not in (None, '')
+            }
+            rows.append({'recipients': recipients, 'parameters': parameters})
+    except (UnicodeDecodeError, csv.Error) as e:
+        return None, None, f'Invalid CSV file: {str(e)}'
+    
+    if not rows:
+        return None, None, 'CSV file contains no rows'
+    
+    return rows, request.form, None
+
+def _as_bool(value, default):
+    """Interpret a JSON or form-field option as a boolean"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ['true', '1', 'yes', 'on']
+    return bool(value)
+
+def _build_attachment_data(template_id, parameter_values):
+    """Attachment payload carrying the parameter values used for an email"""
+    return {
+        'data': parameter_values,
+        'format': 'json',
+        'filename': f'template_data_{template_id}_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.json'
+    }
+
+# Response keys and columns selected by the log listing
+LOG_LIST_COLUMNS = (
+    ('log_id', EmailGenerationLog.LogId),
+    ('template_id', EmailGenerationLog.EmailTemplateId),
+    ('template_name', Template.TemplateName),
+    ('generated_by', EmailGenerationLog.GeneratedBy),
+    ('generation_time', EmailGenerationLog.GenerationTime),
+    ('subject_generated', EmailGenerationLog.SubjectGenerated),
+    ('status', EmailGenerationLog.Status),
+    ('auto_sent', EmailGenerationLog.AutoSent),
+    ('attachment_included', EmailGenerationLog.AttachmentIncluded),
+    ('error_message', EmailGenerationLog.ErrorMessage)
+)
+
 @email_generation_bp.route('/logs', methods=['GET'])
 def get_generation_logs():
-    """Get email generation logs with optional filtering"""
+    """
+    Get email generation logs with optional filtering, newest first
+    
+    Query Parameters:
+    - template_id: Only logs for this template
+    - status: Only logs with this status
+    - limit: Page size (default: 50, max: 100)
+    - cursor: next_cursor from the previous page
+    - offset: Legacy offset paging (ignored when cursor is given)
+    - include_recipients: 'true' to decode and return recipient lists
+    - include_total: 'false' to skip counting all matching logs (default: 'true')
+    """
     try:
         user_entitlements = get_user_entitlements()
         
@@ -178,63 +494,131 @@ def get_generation_logs():
         template_id = request.args.get('template_id')
         status = request.args.get('status')
         limit = min(int(request.args.get('limit', 50)), 100)  # Max 100 records
-        offset = int(request.args.get('offset', 0))
-        
-        # Build query
-        query = EmailGenerationLog.query
-        
-        if template_id:
-            query = query.filter_by(EmailTemplateId=template_id)
-        
-        if status:
-            query = query.filter_by(Status=status.upper())
+        cursor = request.args.get('cursor')
+        offset = 0 if cursor else int(request.args.get('offset', 0))
+        include_recipients = _as_bool(request.args.get('include_recipients'), False)
+        include_total = _as_bool(request.args.get('include_total'), True)
         
         # Apply access control - only show logs for accessible applications
         accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
-        if accessible_apps:
-            query = query.join(Template).filter(Template.ApplicationName.in_(accessible_apps))
-        else:
+        if not accessible_apps:
             # No access to any applications
             return jsonify([]), 200
         
-        # Get total count
-        total_count = query.count()
+        conditions = [Template.ApplicationName.in_(accessible_apps)]
+        if template_id:
+            conditions.append(EmailGenerationLog.EmailTemplateId == template_id)
+        if status:
+            conditions.append(EmailGenerationLog.Status == status.upper())
+        
+        # One joined query selecting only the columns returned (Recipients only when asked for)
+        columns = [column for _, column in LOG_LIST_COLUMNS]
+        if include_recipients:
+            columns.append(EmailGenerationLog.Recipients)
+        
+        query = db.session.query(*columns)\
+                          .join(Template, Template.EmailTemplateId == EmailGenerationLog.EmailTemplateId)\
+                          .filter(*conditions)
+        
+        total_count = None
+        if include_total:
+            total_count = db.session.query(func.count(EmailGenerationLog.LogId))\
+                                    .join(Template, Template.EmailTemplateId == EmailGenerationLog.EmailTemplateId)\
+                                    .filter(*conditions)\
+                                    .scalar()
         
-        # Apply pagination and ordering
-        logs = query.order_by(EmailGenerationLog.GenerationTime.desc()) \
-                   .offset(offset) \
-                   .limit(limit) \
-                   .all()
+        if cursor:
+            generation_time, log_id = QueryService.decode_cursor(cursor, 'logs', True)
+            if not isinstance(generation_time, datetime):
+                raise ValueError('Invalid cursor')
+            query = query.filter(or_(
+                EmailGenerationLog.GenerationTime < generation_time,
+                and_(EmailGenerationLog.GenerationTime == generation_time,
+                     EmailGenerationLog.LogId < log_id)
+            ))
+        
+        # Seek on (GenerationTime, LogId); one extra row tells us whether another page exists
+        rows = query.order_by(EmailGenerationLog.GenerationTime.desc(), EmailGenerationLog.LogId.desc())\
+                    .offset(offset)\
+                    .limit(limit + 1)\
+                    .all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         # Format response
         log_data = []
-        for log in logs:
-            log_dict = {
-                'log_id': log.LogId,
-                'template_id': log.EmailTemplateId,
-                'template_name': log.template.TemplateName if log.template else None,
-                'generated_by': log.GeneratedBy,
-                'generation_time': log.GenerationTime.isoformat(),
-                'recipients': json.loads(log.Recipients) if log.Recipients else [],
-                'subject_generated': log.SubjectGenerated,
-                'status': log.Status,
-                'auto_sent': log.AutoSent,
-                'attachment_included': log.AttachmentIncluded,
-                'error_message': log.ErrorMessage
-            }
+        for row in rows:
+            log_dict = {key: value for (key, _), value in zip(LOG_LIST_COLUMNS, row)}
+            log_dict['generation_time'] = log_dict['generation_time'].isoformat()
+            if include_recipients:
+                log_dict['recipients'] = json.loads(row[-1]) if row[-1] else []
             log_data.append(log_dict)
         
+        pagination = {
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': QueryService.encode_cursor(
+                'logs', True, rows[-1].GenerationTime, rows[-1].LogId
+            ) if has_more and rows else None
+        }
+        if not cursor:
+            pagination['offset'] = offset
+        if include_total:
+            pagination['total_count'] = total_count
+        
         return jsonify({
             'logs': log_data,
-            'pagination': {
-                'total_count': total_count,
-                'limit': limit,
-                'offset': offset,
-                'has_more': offset + limit < total_count
-            }
+            'pagination': pagination
         })
         
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
         return jsonify({
             'error': f'Failed to retrieve logs: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@email_generation_bp.route('/logs/<log_id>', methods=['GET'])
+def get_generation_log(log_id):
+    """Get the status of a single email generation (e.g. to poll an outbox submission)"""
+    try:
+        user_entitlements = get_user_entitlements()
+        
+        log = db.session.get(EmailGenerationLog, log_id)
+        if log is None:
+            return jsonify({'error': 'Log not found'}), 404
+        
+        # Only show logs for accessible applications
+        if not log.template or not AuthService.has_application_access(user_entitlements, log.template.ApplicationName, 'read'):
+            return jsonify({'error': 'Access denied to this application'}), 403
+        
+        log_dict = {
+            'log_id': log.LogId,
+            'template_id': log.EmailTemplateId,
+            'template_name': log.template.TemplateName,
+            'generated_by': log.GeneratedBy,
+            'generation_time': log.GenerationTime.isoformat(),
+            'recipients': json.loads(log.Recipients) if log.Recipients else [],
+            'subject_generated': log.SubjectGenerated,
+            'status': log.Status,
+            'auto_sent': log.AutoSent,
+            'attachment_included': log.AttachmentIncluded,
+            'draft_id': log.OutlookDraftId,
+            'error_message': log.ErrorMessage
+        }
+        
+        if log.Status == 'PENDING':
+            outbox_entry = EmailOutbox.query.filter_by(LogId=log.LogId).first()
+            if outbox_entry:
+                log_dict['outbox'] = {
+                    'attempts': outbox_entry.Attempts,
+                    'next_attempt_at': outbox_entry.AvailableAt.isoformat(),
+                    'last_error': outbox_entry.ErrorMessage
+                }
+        
+        return jsonify(log_dict)
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Failed to retrieve log: {str(e)}'
+        }), 500
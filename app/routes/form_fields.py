@@ -1,21 +1,20 @@
-from flask import Blueprint, request, jsonify
-from app.models.parameter import FormFieldConfiguration, FormFieldOption
+from flask import Blueprint, request, jsonify, current_app
+from app.models.parameter import FormFieldConfiguration
 from app.services.auth_service import AuthService
+from app.services.form_field_service import FormFieldService
+from app.utils.entitlements import get_user_entitlements
 from app import db
 
 form_fields_bp = Blueprint('form_fields', __name__)
 
-def get_user_entitlements():
-    """
-    Extract user entitlements from request headers or JWT token
-    For now, return empty list - this should be implemented based on your auth system
-    """
-    # TODO: Implement based on your authentication system
-    return request.headers.get('X-User-Entitlements', '').split(',') if request.headers.get('X-User-Entitlements') else []
-
 @form_fields_bp.route('/configuration', methods=['GET'])
 def get_form_configuration():
-    """Get form field configuration for application (only for approved/active applications)"""
+    """
+    Get form field configuration for application (only for approved/active applications)
+    
+    Served from a per-application snapshot with a strong ETag; a matching
+    If-None-Match gets 304 Not Modified.
+    """
     try:
         user_entitlements = get_user_entitlements()
         application = request.args.get('application')
@@ -27,15 +26,55 @@ def get_form_configuration():
         if not AuthService.has_application_access(user_entitlements, application, 'read'):
             return jsonify({'error': 'Access denied to this application'}), 403
         
-        configurations = FormFieldConfiguration.query\
-                                             .filter_by(ApplicationName=application, IsActive=True)\
-                                             .order_by(FormFieldConfiguration.SortOrder)\
-                                             .all()
+        body, etag = FormFieldService.get_configuration_snapshot(application)
+        
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        # Access depends on the caller's entitlements, so only private caches may reuse it
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@form_fields_bp.route('/configuration/<config_id>/options', methods=['GET'])
+def get_form_field_options(config_id):
+    """
+    Page through a field's active options (used for fields with OptionSource 'remote')
+    
+    Query Parameters:
+    - q: Case-insensitive prefix of the option text or value
+    - limit: Page size (default: 50, max: 200)
+    - cursor: next_cursor from the previous page
+    """
+    try:
+        user_entitlements = get_user_entitlements()
+        config = db.session.get(FormFieldConfiguration, config_id)
+        if config is None or not config.IsActive:
+            return jsonify({'error': 'Configuration not found'}), 404
+        
+        # Check if user has access to this configuration's application
+        if not AuthService.has_application_access(user_entitlements, config.ApplicationName, 'read'):
+            return jsonify({'error': 'Access denied to this application'}), 403
+        
+        limit = max(1, min(int(request.args.get('limit', 50)), 200))
+        page = FormFieldService.get_options_page(
+            config_id,
+            search=request.args.get('q'),
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
         
         return jsonify({
-            'ApplicationName': application,
-            'fields': [config.to_dict() for config in configurations]
+            'ConfigId': config_id,
+            'options': page['options'],
+            'pagination': {
+                'limit': limit,
+                'has_more': page['has_more'],
+                'next_cursor': page['next_cursor']
+            }
         })
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -75,19 +114,15 @@ def create_form_configuration():
         db.session.flush()  # To get the ID
         
         # Add options if provided
-        options_data = data.get('options', [])
-        for opt_data in options_data:
-            option = FormFieldOption(
-                ConfigId=config.ConfigId,
-                OptionValue=opt_data.get('Value'),
-                OptionText=opt_data.get('Text'),
-                SortOrder=opt_data.get('SortOrder', 0)
-            )
-            db.session.add(option)
+        FormFieldService.sync_options(config.ConfigId, data.get('options', []))
         
         db.session.commit()
+        FormFieldService.invalidate(application_name)
         
-        return jsonify(config.to_dict()), 201
+        return jsonify(FormFieldService.get_configuration_dict(config)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -113,24 +148,17 @@ def update_form_configuration(config_id):
         config.SortOrder = data.get('SortOrder', config.SortOrder)
         config.IsActive = data.get('IsActive', config.IsActive)
         
-        # Update options if provided
+        # Diff options against the existing ones (matched on Value) if provided
         if 'options' in data:
-            # Remove existing options
-            FormFieldOption.query.filter_by(ConfigId=config_id).delete()
-            
-            # Add new options
-            for opt_data in data['options']:
-                option = FormFieldOption(
-                    ConfigId=config_id,
-                    OptionValue=opt_data.get('Value'),
-                    OptionText=opt_data.get('Text'),
-                    SortOrder=opt_data.get('SortOrder', 0)
-                )
-                db.session.add(option)
+            FormFieldService.sync_options(config_id, data['options'])
         
         db.session.commit()
+        FormFieldService.invalidate(config.ApplicationName)
         
-        return jsonify(config.to_dict())
+        return jsonify(FormFieldService.get_configuration_dict(config))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -150,6 +178,7 @@ def delete_form_configuration(config_id):
         # Soft delete by setting IsActive to False
         config.IsActive = False
         db.session.commit()
+        FormFieldService.invalidate(config.ApplicationName)
         
         return jsonify({'message': 'Configuration deleted successfully'})
     except Exception as e:
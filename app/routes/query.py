@@ -1,6 +1,11 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, send_file
 from app.services.query_service import QueryService
+from app.services.auth_service import AuthService
+from app.utils.entitlements import get_user_entitlements
 import json
+import csv
+import io
+import tempfile
 
 query_bp = Blueprint('query', __name__)
 
@@ -15,6 +20,10 @@ def query_templates():
     - sort_order: 'asc' or 'desc'
     - page: Page number (default: 1)
     - page_size: Items per page (default: 50, max: 200)
+    - pagination: 'offset' (default) or 'cursor'
+    - cursor: next_cursor from the previous page (implies cursor pagination)
+    - total: 'exact', 'estimate' or 'none' (default: 'exact' for offset, 'none' for cursor)
+    - fields: Comma-separated template keys to return, e.g. 'Id,TemplateName' (default: all)
     """
     try:
         # Get query parameters
@@ -23,6 +32,10 @@ def query_templates():
         sort_order = request.args.get('sort_order', 'asc')
         page = int(request.args.get('page', 1))
         page_size = min(int(request.args.get('page_size', 50)), 200)  # Max 200 items per page
+        cursor = request.args.get('cursor')
+        pagination = request.args.get('pagination', 'offset')
+        total_mode = request.args.get('total')
+        fields = request.args.get('fields')
         
         # Parse filters
         filters = []
@@ -38,8 +51,7 @@ def query_templates():
             if not is_valid:
                 return jsonify({'error': error_message}), 400
         
-        # For now, allow access to all applications (no auth)
-        user_entitlements = ['RDB', 'RISKTECH', 'OTHER']
+        user_entitlements = get_user_entitlements()
         
         # Execute query
         result = QueryService.query_templates(
@@ -48,7 +60,11 @@ def query_templates():
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            pagination=pagination,
+            total_mode=total_mode,
+            fields=fields
         )
         
         return jsonify(result)
@@ -62,6 +78,8 @@ def query_templates():
 def query_templates_post():
     """
     Query templates using POST with JSON body for complex filters
+    
+    Accepts the same pagination options and fields projection as GET in the body.
     """
     try:
         data = request.get_json() or {}
@@ -72,6 +90,10 @@ def query_templates_post():
         sort_order = data.get('sort_order', 'asc')
         page = data.get('page', 1)
         page_size = min(data.get('page_size', 50), 200)  # Max 200 items per page
+        cursor = data.get('cursor')
+        pagination = data.get('pagination', 'offset')
+        total_mode = data.get('total')
+        fields = data.get('fields')
         
         # Validate filters
         if filters:
@@ -79,8 +101,7 @@ def query_templates_post():
             if not is_valid:
                 return jsonify({'error': error_message}), 400
         
-        # For now, allow access to all applications (no auth)
-        user_entitlements = ['RDB', 'RISKTECH', 'OTHER']
+        user_entitlements = get_user_entitlements()
         
         # Execute query
         result = QueryService.query_templates(
@@ -89,11 +110,17 @@ def query_templates_post():
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            pagination=pagination,
+            total_mode=total_mode,
+            fields=fields
         )
         
         return jsonify(result)
         
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Query failed: {str(e)}'}), 500
 
@@ -105,8 +132,8 @@ def get_query_metadata():
     try:
         metadata = QueryService.get_field_metadata()
         
-        # Add accessible applications (no auth for now)
-        metadata['accessible_applications'] = ['RDB', 'RISKTECH', 'OTHER']
+        # Add the caller's accessible applications
+        metadata['accessible_applications'] = AuthService.get_user_applications(get_user_entitlements(), 'read')
         
         return jsonify(metadata)
         
@@ -117,10 +144,15 @@ def get_query_metadata():
 def get_templates_count():
     """
     Get count of templates matching filter criteria (without returning data)
+    
+    Query Parameters:
+    - filters: JSON string of filter conditions
+    - mode: 'exact' (default) or 'estimate'
     """
     try:
         # Get filters
         filters_param = request.args.get('filters')
+        mode = request.args.get('mode', 'exact')
         filters = []
         if filters_param:
             try:
@@ -134,40 +166,105 @@ def get_templates_count():
             if not is_valid:
                 return jsonify({'error': error_message}), 400
         
-        # For now, allow access to all applications (no auth)
-        user_entitlements = ['RDB', 'RISKTECH', 'OTHER']
+        user_entitlements = get_user_entitlements()
         
-        # Execute count query (page_size=0 returns only count)
-        result = QueryService.query_templates(
+        # Execute count query (served from the count cache when possible)
+        count, is_estimate = QueryService.count_templates(
             user_entitlements=user_entitlements,
             filters=filters,
-            page=1,
-            page_size=0  # Special case for count only
+            mode=mode
         )
         
         return jsonify({
-            'count': result['total'],
+            'count': count,
+            'is_estimate': is_estimate,
             'filters_applied': filters
         })
         
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Count query failed: {str(e)}'}), 500
 
+@query_bp.route('/templates/facets', methods=['GET', 'POST'])
+def get_templates_facets():
+    """
+    Get template counts grouped by facet fields for the filter criteria
+    
+    Query Parameters (or JSON body for POST):
+    - filters: Filter conditions (JSON string for GET)
+    - fields: Facet fields, comma separated for GET (default: all facet fields)
+    - limit: Maximum values returned per facet (default: 50)
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            filters = data.get('filters', [])
+            fields = data.get('fields')
+            limit = int(data.get('limit', 50))
+        else:
+            filters_param = request.args.get('filters')
+            filters = []
+            if filters_param:
+                try:
+                    filters = json.loads(filters_param)
+                except json.JSONDecodeError:
+                    return jsonify({'error': 'Invalid filters JSON format'}), 400
+            fields_param = request.args.get('fields')
+            fields = [field.strip() for field in fields_param.split(',') if field.strip()] if fields_param else None
+            limit = int(request.args.get('limit', 50))
+        
+        # Validate filters
+        if filters:
+            is_valid, error_message = QueryService.validate_filters(filters)
+            if not is_valid:
+                return jsonify({'error': error_message}), 400
+        
+        user_entitlements = get_user_entitlements()
+        
+        facets = QueryService.facet_templates(
+            user_entitlements=user_entitlements,
+            filters=filters,
+            fields=fields
+        )
+        
+        return jsonify({
+            'facets': {
+                field: {
+                    'values': values[:limit] if limit > 0 else values,
+                    'distinct': len(values)
+                }
+                for field, values in facets.items()
+            },
+            'filters_applied': filters
+        })
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Facet query failed: {str(e)}'}), 500
+
 @query_bp.route('/templates/export', methods=['GET', 'POST'])
 def export_templates():
     """
     Export templates matching filter criteria in various formats
+    
+    csv and ndjson exports are streamed row by row with no size limit, and
+    xlsx is written row by row to a temporary file; json returns a single
+    response of up to 10,000 templates.
     """
     try:
         # Get format
         export_format = request.args.get('format', 'json').lower()
-        if export_format not in ['csv', 'json', 'xlsx']:
-            return jsonify({'error': 'Invalid format. Allowed: csv, json, xlsx'}), 400
+        if export_format not in ['csv', 'ndjson', 'json', 'xlsx']:
+            return jsonify({'error': 'Invalid format. Allowed: csv, ndjson, json, xlsx'}), 400
         
-        # Get filters
+        # Get filters and sort
         if request.method == 'POST':
             data = request.get_json() or {}
             filters = data.get('filters', [])
+            sort_by = data.get('sort_by')
+            sort_order = data.get('sort_order', 'asc')
         else:
             filters_param = request.args.get('filters')
             filters = []
@@ -176,6 +273,8 @@ def export_templates():
                     filters = json.loads(filters_param)
                 except json.JSONDecodeError:
                     return jsonify({'error': 'Invalid filters JSON format'}), 400
+            sort_by = request.args.get('sort_by')
+            sort_order = request.args.get('sort_order', 'asc')
         
         # Validate filters
         if filters:
@@ -183,10 +282,36 @@ def export_templates():
             if not is_valid:
                 return jsonify({'error': error_message}), 400
         
-        # For now, allow access to all applications (no auth)
-        user_entitlements = ['RDB', 'RISKTECH', 'OTHER']
+        user_entitlements = get_user_entitlements()
         
-        # Execute query (get all results for export)
+        if export_format in ('csv', 'ndjson', 'xlsx'):
+            rows = QueryService.stream_templates(
+                user_entitlements=user_entitlements,
+                filters=filters,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                chunk_size=current_app.config.get('QUERY_EXPORT_CHUNK_SIZE', 1000),
+                iso_dates=export_format != 'xlsx'
+            )
+            
+            if export_format == 'xlsx':
+                return send_file(
+                    _xlsx_file(rows),
+                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    as_attachment=True,
+                    download_name='templates_export.xlsx'
+                )
+            
+            if export_format == 'csv':
+                body, mimetype = _csv_chunks(rows), 'text/csv'
+            else:
+                body, mimetype = _ndjson_chunks(rows), 'application/x-ndjson'
+            
+            response = Response(stream_with_context(body), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename=templates_export.{export_format}'
+            return response
+        
+        # json: execute query (get all results for export)
         result = QueryService.query_templates(
             user_entitlements=user_entitlements,
             filters=filters,
@@ -194,25 +319,80 @@ def export_templates():
             page_size=10000  # Large page size for export
         )
         
-        # Format response based on requested format
-        if export_format == 'json':
-            return jsonify(result)
-        elif export_format == 'csv':
-            # Convert to CSV format
-            import csv
-            import io
-            
-            output = io.StringIO()
-            if result['data']:
-                fieldnames = result['data'][0].keys()
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(result['data'])
-            
-            response = make_response(output.getvalue())
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Content-Disposition'] = 'attachment; filename=templates_export.csv'
-            return response
+        return jsonify(result)
         
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
-        return jsonify({'error': f'Export failed: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Export failed: {str(e)}'}), 500
+
+# Rows written per chunk of a streamed export
+EXPORT_ROWS_PER_CHUNK = 500
+
+def _csv_chunks(rows):
+    """Encode export rows as CSV, yielding the header and then groups of rows"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=[key for key, _ in QueryService.EXPORT_COLUMNS])
+    writer.writeheader()
+    
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_ROWS_PER_CHUNK == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    
+    yield output.getvalue()
+
+def _ndjson_chunks(rows):
+    """Encode export rows as newline-delimited JSON, yielding groups of rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) == EXPORT_ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+# Longest string Excel stores in a single cell
+XLSX_MAX_CELL_LENGTH = 32767
+
+def _xlsx_file(rows):
+    """
+    Write export rows to a write-only workbook in a temporary file
+    
+    Write-only worksheets flush each row to disk as it is appended, so memory
+    stays flat however many rows are exported.
+    
+    Returns:
+        file: Temporary file positioned at the start (deleted when closed)
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    
+    fieldnames = [key for key, _ in QueryService.EXPORT_COLUMNS]
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Templates')
+    sheet.append(fieldnames)
+    
+    for row in rows:
+        values = []
+        for key in fieldnames:
+            value = row[key]
+            if isinstance(value, str):
+                # Control characters are invalid in the XML and long bodies exceed the cell limit
+                value = ILLEGAL_CHARACTERS_RE.sub('', value)[:XLSX_MAX_CELL_LENGTH]
+            values.append(value)
+        sheet.append(values)
+    
+    output = tempfile.TemporaryFile()
+    try:
+        workbook.save(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
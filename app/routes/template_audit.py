@@ -1,20 +1,13 @@
 from flask import Blueprint, request, jsonify
 from app.models.template_audit import TemplateAudit
 from app.services.auth_service import AuthService
+from app.utils.entitlements import get_user_entitlements
 from app.services.audit_service import AuditService
 from datetime import datetime, timedelta
 from app import db
 
 template_audit_bp = Blueprint('template_audit', __name__)
 
-def get_user_entitlements():
-    """
-    Extract user entitlements from request headers or JWT token
-    For now, return empty list - this should be implemented based on your auth system
-    """
-    # TODO: Implement based on your authentication system
-    return request.headers.get('X-User-Entitlements', '').split(',') if request.headers.get('X-User-Entitlements') else []
-
 @template_audit_bp.route('/template/<template_id>', methods=['GET'])
 def get_template_audit_history(template_id):
     """Get audit history for a specific template"""
@@ -1,26 +1,35 @@
 from flask import Blueprint, request, jsonify
 from app.models.template import Template
 from app.services.auth_service import AuthService
+from app.utils.entitlements import get_user_entitlements
 from app.services.audit_service import AuditService
+from app.services.template_engine import TemplateEngine
+from app.services.query_service import QueryService
+from app.services.search_service import SearchService
 from app import db
+from sqlalchemy.orm import load_only
+from datetime import datetime
 
 templates_bp = Blueprint('templates', __name__)
 
-def get_user_entitlements():
-    """
-    Extract user entitlements from request headers or JWT token
-    For now, return empty list - this should be implemented based on your auth system
-    """
-    # TODO: Implement based on your authentication system
-    return request.headers.get('X-User-Entitlements', '').split(',') if request.headers.get('X-User-Entitlements') else []
-
 @templates_bp.route('/', methods=['GET'])
 def get_templates():
-    """Get templates with optional application filter (only for approved/active applications)"""
+    """
+    Get templates with optional application filter (only for approved/active applications)
+    
+    Query Parameters:
+    - application: Only templates for this application
+    - fields: Comma-separated template keys to return, e.g. 'Id,TemplateName' (default: all)
+    """
     try:
         user_entitlements = get_user_entitlements()
         application = request.args.get('application')
         
+        try:
+            fields = Template.resolve_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Get applications user has access to (filtered by approved/active apps)
         accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
         
@@ -32,12 +41,16 @@ def get_templates():
             if not AuthService.has_application_access(user_entitlements, application, 'read'):
                 return jsonify({'error': 'Access denied to this application'}), 403
             
-            templates = Template.query.filter_by(ApplicationName=application).all()
+            query = Template.query.filter_by(ApplicationName=application)
         else:
             # Return templates only for accessible applications
-            templates = Template.query.filter(Template.ApplicationName.in_(accessible_apps)).all()
+            query = Template.query.filter(Template.ApplicationName.in_(accessible_apps))
+        
+        # Sparse fieldset: load only the requested columns
+        if fields:
+            query = query.options(load_only(*Template.load_only_columns(fields)))
         
-        return jsonify([template.to_dict() for template in templates])
+        return jsonify([template.to_dict(fields) for template in query.all()])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -81,8 +94,10 @@ def create_template():
         
         # Log template creation
         AuditService.log_template_insert(template)
+        SearchService.index_template(template)
         
         db.session.commit()
+        QueryService.invalidate_counts()
         
         return jsonify(template.to_dict()), 201
     except Exception as e:
@@ -140,12 +155,15 @@ def update_template(template_id):
         template.AutoSend = data.get('AutoSend', template.AutoSend)
         template.DataAsAttachment = data.get('DataAsAttachment', template.DataAsAttachment)
         template.ModifiedBy = request.headers.get('X-User-ID', 'system')
-        template.ModifiedTime = db.func.now()
+        template.ModifiedTime = datetime.utcnow()
         
         # Log template update
         AuditService.log_template_update(template, original_values)
+        SearchService.index_template(template)
         
         db.session.commit()
+        TemplateEngine.invalidate(template_id)
+        QueryService.invalidate_counts()
         
         return jsonify(template.to_dict())
     except Exception as e:
@@ -167,7 +185,10 @@ def delete_template(template_id):
         AuditService.log_template_delete(template)
         
         db.session.delete(template)
+        SearchService.remove_template(template_id)
         db.session.commit()
+        TemplateEngine.invalidate(template_id)
+        QueryService.invalidate_counts()
         
         return jsonify({'message': 'Template deleted successfully'})
     except Exception as e:
@@ -210,8 +231,10 @@ def duplicate_template(template_id):
         
         # Log duplicate template creation
         AuditService.log_template_insert(duplicate)
+        SearchService.index_template(duplicate)
         
         db.session.commit()
+        QueryService.invalidate_counts()
         
         return jsonify(duplicate.to_dict()), 201
     except Exception as e:
@@ -1,5 +1,79 @@
 from app.models.application import Application
+from app.utils.entitlements import Entitlements
 from app import db
+from flask import current_app, g
+import threading
+import time
+
+class ActiveApplicationsCache:
+    """
+    Process-local cache of active application names
+    
+    Names are reloaded from the Applications table when the TTL
+    (ACTIVE_APPLICATIONS_TTL_SECONDS) expires or the cache version is bumped by
+    an application write. Within a request the snapshot is memoized on flask.g
+    so every access check sees the same set. One cache is kept per Flask
+    application.
+    """
+    
+    EXTENSION_KEY = 'active_applications_cache'
+    
+    def __init__(self, ttl_seconds=30):
+        self.ttl_seconds = ttl_seconds
+        # (names as stored, frozenset of upper-cased names)
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._loaded_version = -1
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def current(cls):
+        """Get the cache for the current Flask application"""
+        cache = current_app.extensions.get(cls.EXTENSION_KEY)
+        if cache is None:
+            cache = current_app.extensions.setdefault(
+                cls.EXTENSION_KEY,
+                cls(current_app.config.get('ACTIVE_APPLICATIONS_TTL_SECONDS', 30))
+            )
+        return cache
+    
+    def snapshot(self):
+        """
+        Get the active application names
+        
+        Returns:
+            tuple: (names as stored, frozenset of upper-cased names)
+        """
+        memo = g.get('_active_applications')
+        if memo is not None:
+            return memo
+        
+        if self._is_stale():
+            with self._lock:
+                # Threads that waited on the lock reuse the names the first thread loaded
+                if self._is_stale():
+                    version = self._version
+                    names = tuple(
+                        name for (name,) in db.session.query(Application.ApplicationName)
+                                                      .filter_by(IsActive=True)
+                    )
+                    self._snapshot = (names, frozenset(name.upper() for name in names))
+                    self._loaded_at = time.monotonic()
+                    self._loaded_version = version
+        
+        memo = self._snapshot
+        g._active_applications = memo
+        return memo
+    
+    def _is_stale(self):
+        return (self._snapshot is None or self._loaded_version != self._version
+                or time.monotonic() - self._loaded_at >= self.ttl_seconds)
+    
+    def invalidate(self):
+        """Force a reload on next use (call after application writes)"""
+        self._version += 1
+        g.pop('_active_applications', None)
 
 class AuthService:
     @staticmethod
@@ -8,7 +82,7 @@ class AuthService:
         Check if user has admin privileges
         
         Args:
-            entitlements: List of entitlement strings
+            entitlements: Entitlements object or list of entitlement strings
             
         Returns:
             Boolean indicating if user has admin access
@@ -16,7 +90,7 @@ class AuthService:
         if not entitlements:
             return False
             
-        return "EmailDrafter>admin>true" in entitlements
+        return Entitlements.coerce(entitlements).is_admin
     
     @staticmethod
     def get_applications():
@@ -36,8 +110,24 @@ class AuthService:
         Returns:
             List of application name strings
         """
-        applications = AuthService.get_applications()
-        return [app.ApplicationName for app in applications]
+        names, _ = ActiveApplicationsCache.current().snapshot()
+        return list(names)
+    
+    @staticmethod
+    def get_active_application_set():
+        """
+        Get the upper-cased names of active applications
+        
+        Returns:
+            frozenset of upper-cased application names
+        """
+        _, upper_names = ActiveApplicationsCache.current().snapshot()
+        return upper_names
+    
+    @staticmethod
+    def invalidate_application_cache():
+        """Drop cached active applications after an application is created or changed"""
+        ActiveApplicationsCache.current().invalidate()
     
     @staticmethod
     def is_application_active(application_name):
@@ -50,11 +140,9 @@ class AuthService:
         Returns:
             Boolean indicating if application is active
         """
-        application = Application.query.filter_by(
-            ApplicationName=application_name, 
-            IsActive=True
-        ).first()
-        return application is not None
+        if not application_name:
+            return False
+        return application_name.upper() in AuthService.get_active_application_set()
     
     @staticmethod
     def can_create_template_for_application(entitlements, application_name):
@@ -62,7 +150,7 @@ class AuthService:
         Check if user can create template for given application
         
         Args:
-            entitlements: List of entitlement strings
+            entitlements: Entitlements object or list of entitlement strings
             application_name: Application name to check
             
         Returns:
@@ -81,34 +169,17 @@ class AuthService:
         Extract applications user has access to from entitlements, filtered by active applications
         
         Args:
-            entitlements: List of entitlement strings
+            entitlements: Entitlements object or list of entitlement strings
             permission_type: 'read', 'write', 'admin'
         
         Returns:
             List of application names user has access to (only active apps)
         """
-        # Get all active application names
-        active_app_names = AuthService.get_application_names()
-        
-        # If no active applications, return empty list
-        if not active_app_names:
+        granted = AuthService._granted_applications(entitlements, permission_type)
+        if not granted:
             return []
         
-        applications = []
-        
-        for entitlement in entitlements:
-            if isinstance(entitlement, str):
-                # Parse entitlement format: EmailDrafter>templates_{application}_{permission}>true
-                parts = entitlement.split('>')
-                if len(parts) >= 3 and parts[0] == 'EmailDrafter' and parts[2] == 'true':
-                    permission_part = parts[1]
-                    if permission_part.startswith('templates_') and permission_part.endswith(f'_{permission_type}'):
-                        # Extract application name
-                        app_name = permission_part[10:-(len(permission_type) + 1)]  # Remove 'templates_' and '_{permission_type}'
-                        if app_name and app_name.upper() in [name.upper() for name in active_app_names]:
-                            applications.append(app_name.upper())
-        
-        return list(set(applications))  # Remove duplicates
+        return list(granted & AuthService.get_active_application_set())
     
     @staticmethod
     def has_application_access(entitlements, application_name, permission_type='read'):
@@ -116,16 +187,37 @@ class AuthService:
         Check if user has specific permission for an application (only for active applications)
         
         Args:
-            entitlements: List of entitlement strings
+            entitlements: Entitlements object or list of entitlement strings
             application_name: Application to check access for
             permission_type: 'read', 'write', 'admin'
         
         Returns:
             Boolean indicating if user has access
         """
-        # First check if application is active
-        if not AuthService.is_application_active(application_name):
+        if not application_name:
             return False
-            
-        accessible_apps = AuthService.get_user_applications(entitlements, permission_type)
-        return application_name.upper() in [app.upper() for app in accessible_apps]
\ No newline at end of file
+        
+        application = application_name.upper()
+        
+        # Application must be active and granted for this permission
+        if application not in AuthService.get_active_application_set():
+            return False
+        
+        granted = AuthService._granted_applications(entitlements, permission_type)
+        return bool(granted) and application in granted
+    
+    @staticmethod
+    def _granted_applications(entitlements, permission_type):
+        """
+        Applications granted for a permission type by the user's entitlements
+        
+        Args:
+            entitlements: Entitlements object or list of entitlement strings
+            permission_type: 'read', 'write', 'admin'
+        
+        Returns:
+            frozenset of upper-cased application names
+        """
+        if not entitlements:
+            return frozenset()
+        return Entitlements.coerce(entitlements).applications(permission_type)
@@ -0,0 +1,326 @@
+from app.models.parameter import FormFieldConfiguration, FormFieldOption
+from app.utils.cache import LRUCache
+from app import db
+from flask import current_app, json
+from app.services.query_service import QueryService
+from sqlalchemy import and_, or_, func, insert, select, update
+import hashlib
+import threading
+import time
+import uuid
+
+class FormConfigurationCache:
+    """
+    Process-local cache of serialized form configurations
+    
+    Each entry is the JSON body of GET /api/form-fields/configuration for one
+    application, with its strong ETag. Writes through the API invalidate the
+    application's entries (in any letter case); FORM_CONFIG_CACHE_TTL_SECONDS
+    bounds how long writes made by other processes can go unnoticed. One cache
+    is kept per Flask application.
+    """
+    
+    EXTENSION_KEY = 'form_configuration_cache'
+    
+    def __init__(self, ttl_seconds=60, maxsize=256):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(maxsize)
+        self._generations = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def current(cls):
+        """Get the cache for the current Flask application"""
+        cache = current_app.extensions.get(cls.EXTENSION_KEY)
+        if cache is None:
+            config = current_app.config
+            cache = current_app.extensions.setdefault(cls.EXTENSION_KEY, cls(
+                ttl_seconds=config.get('FORM_CONFIG_CACHE_TTL_SECONDS', 60),
+                maxsize=config.get('FORM_CONFIG_CACHE_SIZE', 256)
+            ))
+        return cache
+    
+    def generation(self, application):
+        """Current generation of an application; read it before loading and pass it to set()"""
+        return self._generations.get(application.upper(), 0)
+    
+    def get(self, application):
+        """
+        Look up a cached snapshot
+        
+        Returns:
+            tuple: (body bytes, ETag) or None if nothing current is cached
+        """
+        entry = self._entries.get(application)
+        if entry is None:
+            return None
+        
+        generation, stored_at, body, etag = entry
+        if generation != self.generation(application) or time.monotonic() - stored_at >= self.ttl_seconds:
+            return None
+        return body, etag
+    
+    def set(self, application, body, generation):
+        """
+        Store a snapshot loaded while the application was at generation
+        
+        Returns:
+            str: The snapshot's ETag
+        """
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        self._entries.set(application, (generation, time.monotonic(), body, etag))
+        return etag
+    
+    def invalidate(self, application):
+        """Drop an application's snapshots (call after form configuration writes)"""
+        with self._lock:
+            key = application.upper()
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+class FormFieldService:
+    """Service for loading form field configurations with their options"""
+    
+    @staticmethod
+    def get_active_configurations(application):
+        """
+        Load an application's active field configurations with their active options
+        
+        Runs two queries whatever the number of fields: one for the
+        configurations with their active option counts, and one for the options
+        of every field small enough to inline, grouped in memory. Fields with
+        more than FORM_FIELD_INLINE_OPTION_LIMIT options are left for the UI to
+        page through get_options_page.
+        
+        Args:
+            application (str): Application name
+            
+        Returns:
+            list: (FormFieldConfiguration, options, option count) tuples in field SortOrder;
+                options is None for remote fields
+        """
+        inline_limit = current_app.config.get('FORM_FIELD_INLINE_OPTION_LIMIT', 200)
+        
+        # Counted per field through ix_formfieldoption_config_active_sort
+        option_count = select(func.count(FormFieldOption.OptionId))\
+                       .where(FormFieldOption.ConfigId == FormFieldConfiguration.ConfigId,
+                              FormFieldOption.IsActive == True)\
+                       .correlate(FormFieldConfiguration)\
+                       .scalar_subquery()
+        rows = db.session.query(FormFieldConfiguration, option_count)\
+                         .filter(FormFieldConfiguration.ApplicationName == application,
+                                 FormFieldConfiguration.IsActive == True)\
+                         .order_by(FormFieldConfiguration.SortOrder)\
+                         .all()
+        
+        options_by_config = {
+            config.ConfigId: [] for config, option_count in rows if 0 < option_count <= inline_limit
+        }
+        if options_by_config:
+            options = FormFieldOption.query\
+                                     .filter(FormFieldOption.ConfigId.in_(list(options_by_config)),
+                                             FormFieldOption.IsActive == True)\
+                                     .order_by(FormFieldOption.ConfigId, FormFieldOption.SortOrder)\
+                                     .all()
+            for option in options:
+                options_by_config[option.ConfigId].append(option)
+        
+        return [
+            (config,
+             options_by_config.get(config.ConfigId, []) if option_count <= inline_limit else None,
+             option_count)
+            for config, option_count in rows
+        ]
+    
+    @staticmethod
+    def get_configuration_dicts(application):
+        """
+        Get an application's active field configurations as dicts
+        
+        Args:
+            application (str): Application name
+            
+        Returns:
+            list: FormFieldConfiguration.to_dict() results; remote fields have no inline options
+        """
+        return [
+            config.to_dict(options=options) if options is not None
+            else config.to_dict(remote_option_count=option_count)
+            for config, options, option_count in FormFieldService.get_active_configurations(application)
+        ]
+    
+    @staticmethod
+    def get_configuration_dict(config):
+        """
+        Serialize one field configuration the way get_configuration_dicts does
+        
+        Fields over FORM_FIELD_INLINE_OPTION_LIMIT are returned as remote, so
+        write responses agree with the configuration endpoint.
+        
+        Args:
+            config (FormFieldConfiguration): Field configuration
+            
+        Returns:
+            dict: FormFieldConfiguration.to_dict() result
+        """
+        inline_limit = current_app.config.get('FORM_FIELD_INLINE_OPTION_LIMIT', 200)
+        option_count = db.session.query(func.count(FormFieldOption.OptionId))\
+                                 .filter(FormFieldOption.ConfigId == config.ConfigId,
+                                         FormFieldOption.IsActive == True)\
+                                 .scalar()
+        if option_count > inline_limit:
+            return config.to_dict(remote_option_count=option_count)
+        return config.to_dict()
+    
+    @staticmethod
+    def get_options_page(config_id, search=None, limit=50, cursor=None):
+        """
+        Get one page of a field's active options in SortOrder
+        
+        Pages seek on (SortOrder, OptionId) through ix_formfieldoption_config_active_sort.
+        
+        Args:
+            config_id (str): FormFieldConfiguration id
+            search (str): Case-insensitive prefix of the option's Text or Value
+            limit (int): Page size
+            cursor (str): next_cursor from the previous page
+            
+        Returns:
+            dict: 'options' (FormFieldOption.to_dict() results), 'has_more' and 'next_cursor'
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = FormFieldOption.query.filter(FormFieldOption.ConfigId == config_id,
+                                             FormFieldOption.IsActive == True)
+        if search:
+            query = query.filter(or_(FormFieldOption.OptionText.istartswith(search, autoescape=True),
+                                     FormFieldOption.OptionValue.istartswith(search, autoescape=True)))
+        
+        if cursor:
+            sort_order, option_id = QueryService.decode_cursor(cursor, 'options', False)
+            if not isinstance(sort_order, int):
+                raise ValueError('Invalid cursor')
+            query = query.filter(or_(
+                FormFieldOption.SortOrder > sort_order,
+                and_(FormFieldOption.SortOrder == sort_order, FormFieldOption.OptionId > option_id)
+            ))
+        
+        # One extra row tells us whether another page exists
+        options = query.order_by(FormFieldOption.SortOrder, FormFieldOption.OptionId)\
+                       .limit(limit + 1)\
+                       .all()
+        has_more = len(options) > limit
+        options = options[:limit]
+        
+        return {
+            'options': [option.to_dict() for option in options],
+            'has_more': has_more,
+            'next_cursor': QueryService.encode_cursor(
+                'options', False, options[-1].SortOrder, options[-1].OptionId
+            ) if has_more else None
+        }
+    
+    @staticmethod
+    def get_configuration_snapshot(application):
+        """
+        Get the serialized form configuration for an application, from cache when current
+        
+        Args:
+            application (str): Application name
+            
+        Returns:
+            tuple: (JSON body bytes, strong ETag)
+        """
+        cache = FormConfigurationCache.current()
+        cached = cache.get(application)
+        if cached is not None:
+            return cached
+        
+        generation = cache.generation(application)
+        body = json.dumps({
+            'ApplicationName': application,
+            'fields': FormFieldService.get_configuration_dicts(application)
+        }).encode('utf-8')
+        return body, cache.set(application, body, generation)
+    
+    @staticmethod
+    def invalidate(application):
+        """Drop cached form configuration snapshots for an application"""
+        FormConfigurationCache.current().invalidate(application)
+    
+    @staticmethod
+    def sync_options(config_id, options_data):
+        """
+        Make a field's active options match options_data, diffing on OptionValue
+        
+        New values are inserted, existing values whose text, sort order or active
+        flag changed are updated, and values no longer listed are deactivated,
+        so unchanged options keep their OptionIds. Inserts and updates each go
+        to the database as one executemany. Runs in the caller's transaction.
+        
+        Args:
+            config_id (str): FormFieldConfiguration id
+            options_data (list): Dicts with 'Value', 'Text' (defaults to Value) and 'SortOrder'
+            
+        Returns:
+            dict: Counts of 'inserted', 'updated', 'deactivated' and 'unchanged' options
+            
+        Raises:
+            ValueError: If an option has no Value or a Value is listed twice
+        """
+        desired = {}
+        for opt_data in options_data:
+            value = opt_data.get('Value')
+            if value is None or value == '':
+                raise ValueError('Every option requires a Value')
+            value = str(value)
+            if value in desired:
+                raise ValueError(f"Duplicate option value '{value}'")
+            desired[value] = {
+                'OptionText': str(opt_data.get('Text') if opt_data.get('Text') is not None else value),
+                'SortOrder': opt_data.get('SortOrder', 0),
+                'IsActive': True
+            }
+        
+        existing = db.session.query(
+            FormFieldOption.OptionId, FormFieldOption.OptionValue, FormFieldOption.OptionText,
+            FormFieldOption.SortOrder, FormFieldOption.IsActive
+        ).filter(FormFieldOption.ConfigId == config_id).order_by(FormFieldOption.SortOrder).all()
+        
+        inserts = []
+        updates = []
+        unchanged = 0
+        deactivated = 0
+        matched = set()
+        for option_id, value, text, sort_order, is_active in existing:
+            target = desired.get(value) if value not in matched else None
+            if target is None:
+                # No longer listed (or a duplicate row for a value already matched)
+                if is_active:
+                    # Same keys as the other updates so they share one executemany
+                    updates.append({'OptionId': option_id, 'OptionText': text, 'SortOrder': sort_order, 'IsActive': False})
+                    deactivated += 1
+                continue
+            
+            matched.add(value)
+            current = {'OptionText': text, 'SortOrder': sort_order, 'IsActive': is_active}
+            if current == target:
+                unchanged += 1
+            else:
+                updates.append({'OptionId': option_id, **target})
+        
+        for value, target in desired.items():
+            if value not in matched:
+                inserts.append({'OptionId': str(uuid.uuid4()), 'ConfigId': config_id, 'OptionValue': value, **target})
+        
+        if inserts:
+            db.session.execute(insert(FormFieldOption), inserts)
+        if updates:
+            db.session.execute(update(FormFieldOption), updates)
+        
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates) - deactivated,
+            'deactivated': deactivated,
+            'unchanged': unchanged
+        }
@@ -0,0 +1,130 @@
+from cryptography.hazmat.primitives import serialization
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class AccessTokenCache:
+    """
+    Thread-safe cache for a client-credentials access token
+
+    The token is reused until expiry_skew seconds before it expires. Once it
+    is within refresh_margin seconds of expiry a single background refresh is
+    started while callers keep receiving the current token. When no usable
+    token exists, concurrent callers are collapsed onto one synchronous fetch.
+    """
+
+    def __init__(self, refresh_margin=300, expiry_skew=60):
+        self.refresh_margin = refresh_margin
+        self.expiry_skew = expiry_skew
+        self._token = None
+        self._expires_at = 0.0
+        # Held by whichever thread is fetching a new token
+        self._refresh_lock = threading.Lock()
+
+    def get_token(self, fetch):
+        """
+        Get a valid access token
+
+        Args:
+            fetch: Callable returning (access_token, expires_in_seconds)
+
+        Returns:
+            str: Access token
+        """
+        token, expires_at = self._token, self._expires_at
+        now = time.monotonic()
+
+        if token is not None and now < expires_at - self.expiry_skew:
+            if now >= expires_at - self.refresh_margin and self._refresh_lock.acquire(blocking=False):
+                threading.Thread(
+                    target=self._background_refresh,
+                    args=(fetch,),
+                    name='graph-token-refresh',
+                    daemon=True
+                ).start()
+            return token
+
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited
+            if self._token is not None and time.monotonic() < self._expires_at - self.expiry_skew:
+                return self._token
+            return self._store(*fetch())
+
+    def invalidate(self, token=None):
+        """
+        Discard the cached token (e.g. after a 401 from Graph)
+
+        Args:
+            token (str): The token that was rejected; if given, the cache is only
+                cleared while it still holds that token, so a token another
+                thread has just refreshed is kept
+        """
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+    def _background_refresh(self, fetch):
+        try:
+            self._store(*fetch())
+        except Exception as e:
+            # The current token stays in use until it expires
+            logger.error(f"Background access token refresh failed: {str(e)}")
+        finally:
+            self._refresh_lock.release()
+
+    def _store(self, token, expires_in):
+        self._expires_at = time.monotonic() + float(expires_in)
+        self._token = token
+        return token
+
+class PrivateKeyCache:
+    """
+    Process-wide cache of parsed PEM private keys
+
+    A key is parsed (and decrypted) once and shared across threads. Each lookup
+    only stats the file; the key is reloaded when its mtime or size changes,
+    e.g. after certificate rotation.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, password=None):
+        """
+        Get the private key stored at path
+
+        Args:
+            path (str): Path to the PEM file
+            password (bytes): Password protecting the key, if any
+
+        Returns:
+            Parsed private key object
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size, password)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+
+            with open(path, 'rb') as key_file:
+                private_key = serialization.load_pem_private_key(key_file.read(), password=password)
+
+            self._entries[path] = (stamp, private_key)
+            return private_key
+
+    def clear(self):
+        """Forget all cached keys"""
+        with self._lock:
+            self._entries.clear()
+
+private_key_cache = PrivateKeyCache()
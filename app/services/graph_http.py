@@ -0,0 +1,95 @@
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default (connect, read) timeout to every request"""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+class GraphHttp:
+    """
+    Shared HTTP session for Microsoft Graph and token endpoint calls
+
+    One keep-alive session with a sized connection pool is kept per Flask
+    application, so TLS connections to graph.microsoft.com and
+    login.microsoftonline.com are reused across requests. Throttling responses
+    (429, 503) are retried honouring Retry-After; requests that may already have
+    reached the server are not retried after a read failure.
+    """
+
+    EXTENSION_KEY = 'graph_http_session'
+
+    @staticmethod
+    def session():
+        """Get the shared session for the current Flask application"""
+        session = current_app.extensions.get(GraphHttp.EXTENSION_KEY)
+        if session is None:
+            session = current_app.extensions.setdefault(
+                GraphHttp.EXTENSION_KEY,
+                GraphHttp.build_session(current_app.config)
+            )
+        return session
+
+    @staticmethod
+    def install(session, app=None):
+        """
+        Replace the shared session, e.g. with one pointed at a local stub server
+
+        Args:
+            session: requests.Session-compatible object
+            app: Flask application (defaults to current_app)
+        """
+        app = app or current_app._get_current_object()
+        previous = app.extensions.pop(GraphHttp.EXTENSION_KEY, None)
+        app.extensions[GraphHttp.EXTENSION_KEY] = session
+        if previous is not None and previous is not session:
+            previous.close()
+
+    @staticmethod
+    def build_session(config):
+        """
+        Build a pooled session from application config
+
+        Args:
+            config: Flask config mapping
+
+        Returns:
+            TimeoutSession: Configured session
+        """
+        max_retries = config.get('GRAPH_HTTP_MAX_RETRIES', 3)
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset(['GET', 'POST', 'PATCH', 'DELETE']),
+            respect_retry_after_header=True,
+            backoff_factor=config.get('GRAPH_HTTP_BACKOFF_FACTOR', 0.5),
+            raise_on_status=False
+        )
+
+        pool_size = config.get('GRAPH_HTTP_POOL_SIZE', 20)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+        session = TimeoutSession(timeout=(
+            config.get('GRAPH_HTTP_CONNECT_TIMEOUT', 5),
+            config.get('GRAPH_HTTP_READ_TIMEOUT', 30)
+        ))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @staticmethod
+    def graph_url(path):
+        """Absolute Graph API URL for a path such as '/users/{id}/messages'"""
+        base_url = current_app.config.get('GRAPH_API_BASE_URL') or 'https://graph.microsoft.com/v1.0'
+        return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
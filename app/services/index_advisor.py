@@ -0,0 +1,161 @@
+from app.models.template import Template
+from app.models.template_audit import TemplateAudit
+from app.models.email_generation_log import EmailGenerationLog
+from app.services.query_service import QueryService
+from app import db
+from sqlalchemy import event, select
+from datetime import datetime
+import re
+
+class IndexAdvisor:
+    """
+    Captures query plans for the application's main access paths and flags scans
+
+    Each template sort and filter from QueryService.ALLOWED_FIELDS is planned as
+    query_templates would run it, together with the log and audit listings.
+    Plans come from EXPLAIN QUERY PLAN on SQLite and SHOWPLAN_TEXT on SQL
+    Server; other databases are not supported.
+    """
+
+    # Plan fragments flagged as issues, per dialect
+    PLAN_ISSUES = {
+        'sqlite': (
+            (re.compile(r'^SCAN (?!.*\bUSING (COVERING )?INDEX\b)'), 'full scan'),
+            (re.compile(r'USE TEMP B-TREE FOR (ORDER|GROUP) BY'), 'sort'),
+        ),
+        'mssql': (
+            (re.compile(r'\b(Table Scan|Clustered Index Scan)\b'), 'full scan'),
+            (re.compile(r'(?<!Clustered )\bIndex Scan\b'), 'index scan'),
+            (re.compile(r'\bSort\('), 'sort'),
+        ),
+    }
+
+    # Sample values used when planning filters, by column type
+    SAMPLE_VALUES = {
+        db.String: 'sample',
+        db.Text: 'sample',
+        db.Boolean: True,
+        db.DateTime: datetime(2024, 1, 1),
+    }
+
+    @classmethod
+    def access_paths(cls, applications):
+        """
+        Build the statements to plan
+
+        Args:
+            applications (list): Application names used in the ApplicationName IN (...) scope
+
+        Returns:
+            list: (name, statement) pairs
+        """
+        scope = Template.ApplicationName.in_(applications)
+        paths = []
+
+        for key, field in QueryService.ALLOWED_FIELDS.items():
+            for descending in (False, True):
+                paths.append((
+                    f"templates sort {key} {'desc' if descending else 'asc'}",
+                    select(Template).where(scope)
+                                    .order_by(*QueryService._order_by(key, descending))
+                                    .limit(50)
+                ))
+
+            sample = cls._sample_value(field)
+            paths.append((
+                f"templates filter {key} eq",
+                select(Template).where(scope, QueryService._build_condition(field, 'eq', sample))
+                                .order_by(*QueryService._order_by(*QueryService._resolve_sort(None, None)))
+                                .limit(50)
+            ))
+
+        paths.extend([
+            ('logs by template', select(EmailGenerationLog)
+                .where(EmailGenerationLog.EmailTemplateId == 'sample')
+                .order_by(EmailGenerationLog.GenerationTime.desc()).limit(50)),
+            ('logs by status', select(EmailGenerationLog)
+                .where(EmailGenerationLog.Status == 'FAILED')
+                .order_by(EmailGenerationLog.GenerationTime.desc()).limit(50)),
+            ('logs newest first', select(EmailGenerationLog)
+                .order_by(EmailGenerationLog.GenerationTime.desc(), EmailGenerationLog.LogId.desc()).limit(50)),
+            ('audit by user', select(TemplateAudit)
+                .where(TemplateAudit.AuditUser == 'sample')
+                .order_by(TemplateAudit.AuditTimestamp.desc()).limit(50)),
+            ('audit by template', select(TemplateAudit)
+                .where(TemplateAudit.EmailTemplateId == 'sample')
+                .order_by(TemplateAudit.AuditTimestamp.desc()).limit(50)),
+        ])
+        return paths
+
+    @classmethod
+    def report(cls, applications=None):
+        """
+        Plan every access path
+
+        Args:
+            applications (list): Applications for the template scope (defaults to the active ones)
+
+        Returns:
+            list: Dicts with 'path', 'plan' (list of plan lines) and 'issues' (list of flags)
+
+        Raises:
+            ValueError: If the database dialect is not supported
+        """
+        dialect = db.engine.dialect.name
+        if dialect not in cls.PLAN_ISSUES:
+            raise ValueError(f"Query plans are not supported for the '{dialect}' dialect")
+
+        if not applications:
+            from app.services.auth_service import AuthService
+            applications = AuthService.get_application_names()[:3] or ['SAMPLE']
+
+        results = []
+        with db.engine.connect() as connection:
+            for name, statement in cls.access_paths(applications):
+                plan = cls._explain(connection, dialect, statement)
+                issues = sorted({
+                    issue for line in plan
+                    for pattern, issue in cls.PLAN_ISSUES[dialect]
+                    if pattern.search(line)
+                })
+                results.append({'path': name, 'plan': plan, 'issues': issues})
+        return results
+
+    @staticmethod
+    def _explain(connection, dialect, statement):
+        """Run a statement in plan-only mode and return its plan lines"""
+        captured = []
+
+        def before_cursor_execute(conn, cursor, sql, parameters, context, executemany):
+            if dialect == 'sqlite':
+                return 'EXPLAIN QUERY PLAN ' + sql, parameters
+            cursor.execute('SET SHOWPLAN_TEXT ON')
+            return sql, parameters
+
+        def after_cursor_execute(conn, cursor, sql, parameters, context, executemany):
+            if dialect == 'sqlite':
+                # Rows are (id, parent, notused, detail)
+                captured.extend(row[-1] for row in cursor.fetchall())
+                return
+            while True:
+                captured.extend(str(row[0]).strip() for row in cursor.fetchall())
+                if not cursor.nextset():
+                    break
+            cursor.execute('SET SHOWPLAN_TEXT OFF')
+
+        event.listen(connection, 'before_cursor_execute', before_cursor_execute, retval=True)
+        event.listen(connection, 'after_cursor_execute', after_cursor_execute)
+        try:
+            connection.execute(statement)
+        finally:
+            event.remove(connection, 'before_cursor_execute', before_cursor_execute)
+            event.remove(connection, 'after_cursor_execute', after_cursor_execute)
+        return captured
+
+    @classmethod
+    def _sample_value(cls, field):
+        column_type = field.expression.type
+        for type_class, value in cls.SAMPLE_VALUES.items():
+            if isinstance(column_type, type_class):
+                return value
+        return 'sample'
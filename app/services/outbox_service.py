@@ -0,0 +1,229 @@
+from app.models.email_outbox import EmailOutbox
+from app.models.email_generation_log import EmailGenerationLog
+from app.services.outlook_service import OutlookService
+from app import db
+from datetime import datetime, timedelta
+import json
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class OutboxService:
+    """DB-backed outbox for delivering generated emails to Microsoft Graph asynchronously"""
+
+    @staticmethod
+    def enqueue(log_entry, sender, subject, body, recipients, auto_send=False, attachment_data=None):
+        """
+        Queue a rendered email for delivery (the caller commits)
+
+        Args:
+            log_entry: EmailGenerationLog row with Status 'PENDING' and LogId set
+            sender (str): Sender mailbox
+            subject (str): Rendered subject
+            body (str): Rendered HTML body
+            recipients (list): Recipient email addresses
+            auto_send (bool): Send immediately instead of creating a draft
+            attachment_data: Attachment payload for OutlookService, if any
+        """
+        entry = EmailOutbox(
+            LogId=log_entry.LogId,
+            Sender=sender,
+            Subject=subject,
+            Body=body,
+            Recipients=json.dumps(recipients),
+            AutoSend=auto_send,
+            AttachmentData=json.dumps(attachment_data) if attachment_data else None
+        )
+        db.session.add(entry)
+        return entry
+
+    @staticmethod
+    def claim_batch(limit, visibility_timeout=300, max_attempts=3):
+        """
+        Atomically claim up to limit due outbox rows for this worker
+
+        Rows left in PROCESSING longer than visibility_timeout seconds (e.g. by a
+        crashed or hung worker) count as a failed attempt. They are released back
+        to PENDING, or marked FAILED once max_attempts is reached, so a row that
+        keeps killing its worker is not reclaimed forever.
+
+        Returns:
+            list: Claimed EmailOutbox rows
+        """
+        now = datetime.utcnow()
+        stale = (
+            EmailOutbox.Status == 'PROCESSING',
+            EmailOutbox.ClaimedAt < now - timedelta(seconds=visibility_timeout)
+        )
+
+        expired = db.session.query(EmailOutbox.OutboxId, EmailOutbox.LogId)\
+                            .filter(*stale, EmailOutbox.Attempts + 1 >= max_attempts)\
+                            .all()
+        if expired:
+            error = f'Delivery did not finish within {visibility_timeout} seconds after {max_attempts} attempts'
+            EmailOutbox.query.filter(
+                EmailOutbox.OutboxId.in_([outbox_id for outbox_id, _ in expired]), *stale
+            ).update({
+                'Status': 'FAILED',
+                'Attempts': EmailOutbox.Attempts + 1,
+                'ClaimToken': None,
+                'ErrorMessage': error
+            }, synchronize_session=False)
+            EmailGenerationLog.query.filter(
+                EmailGenerationLog.LogId.in_([log_id for _, log_id in expired]),
+                EmailGenerationLog.Status == 'PENDING'
+            ).update({'Status': 'FAILED', 'ErrorMessage': error}, synchronize_session=False)
+
+        EmailOutbox.query.filter(*stale).update({
+            'Status': 'PENDING',
+            'Attempts': EmailOutbox.Attempts + 1,
+            'ClaimToken': None,
+            'ErrorMessage': 'Worker did not finish delivery within the visibility timeout'
+        }, synchronize_session=False)
+
+        candidate_ids = [
+            row.OutboxId for row in db.session.query(EmailOutbox.OutboxId)
+                                             .filter(EmailOutbox.Status == 'PENDING',
+                                                     EmailOutbox.AvailableAt <= now)
+                                             .order_by(EmailOutbox.AvailableAt)
+                                             .limit(limit)
+        ]
+        if not candidate_ids:
+            db.session.commit()
+            return []
+
+        # The Status guard makes the claim safe against other workers racing for the same rows
+        claim_token = str(uuid.uuid4())
+        EmailOutbox.query.filter(
+            EmailOutbox.OutboxId.in_(candidate_ids),
+            EmailOutbox.Status == 'PENDING'
+        ).update({
+            'Status': 'PROCESSING',
+            'ClaimToken': claim_token,
+            'ClaimedAt': now
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return EmailOutbox.query.filter_by(ClaimToken=claim_token, Status='PROCESSING').all()
+
+    @staticmethod
+    def process_batch(limit, max_attempts=3, retry_delay=60, visibility_timeout=300):
+        """
+        Claim due outbox rows, deliver them via Graph $batch and record the outcome
+
+        Delivered rows are removed from the outbox and their log entries marked
+        SUCCESS. Failed rows are retried with a linear back-off until max_attempts,
+        after which both the outbox row and the log entry are marked FAILED. Rows
+        reclaimed from a stalled worker count against the same limit.
+
+        Returns:
+            int: Number of outbox rows processed
+        """
+        entries = OutboxService.claim_batch(limit, visibility_timeout, max_attempts)
+        if not entries:
+            return 0
+
+        messages = [{
+            'sender': entry.Sender,
+            'subject': entry.Subject,
+            'body': entry.Body,
+            'recipients': json.loads(entry.Recipients),
+            'auto_send': entry.AutoSend,
+            'data_as_attachment': entry.AttachmentData is not None,
+            'attachment_data': json.loads(entry.AttachmentData) if entry.AttachmentData else None
+        } for entry in entries]
+
+        results = OutlookService.create_drafts_batch(messages)
+
+        logs = {
+            log.LogId: log
+            for log in EmailGenerationLog.query.filter(
+                EmailGenerationLog.LogId.in_([entry.LogId for entry in entries])
+            )
+        }
+        now = datetime.utcnow()
+
+        for entry, result in zip(entries, results):
+            log_entry = logs.get(entry.LogId)
+            entry.Attempts += 1
+
+            if result['success']:
+                if log_entry is not None:
+                    log_entry.Status = 'SUCCESS'
+                    log_entry.OutlookDraftId = result.get('draftId')
+                    log_entry.ErrorMessage = None
+                db.session.delete(entry)
+            elif entry.Attempts < max_attempts:
+                entry.Status = 'PENDING'
+                entry.ClaimToken = None
+                entry.AvailableAt = now + timedelta(seconds=retry_delay * entry.Attempts)
+                entry.ErrorMessage = result.get('error')
+            else:
+                entry.Status = 'FAILED'
+                entry.ErrorMessage = result.get('error')
+                if log_entry is not None:
+                    log_entry.Status = 'FAILED'
+                    log_entry.ErrorMessage = result.get('error')
+
+        db.session.commit()
+        return len(entries)
+
+class OutboxWorkerPool:
+    """
+    Background threads draining the outbox to Microsoft Graph
+
+    Each worker claims up to OUTBOX_BATCH_SIZE rows at a time, so at most
+    OUTBOX_WORKERS Graph $batch calls are in flight per process.
+    """
+
+    def __init__(self, app, workers=None, batch_size=None, poll_interval=None):
+        self.app = app
+        self.workers = workers or app.config.get('OUTBOX_WORKERS', 4)
+        self.batch_size = batch_size or app.config.get('OUTBOX_BATCH_SIZE', 20)
+        self.poll_interval = poll_interval or app.config.get('OUTBOX_POLL_INTERVAL_SECONDS', 2)
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'outbox-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        """Signal the workers to stop and wait for them to finish their current batch"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def join(self):
+        """Block until the workers stop"""
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        config = self.app.config
+        while not self._stop_event.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = OutboxService.process_batch(
+                        self.batch_size,
+                        max_attempts=config.get('OUTBOX_MAX_ATTEMPTS', 3),
+                        retry_delay=config.get('OUTBOX_RETRY_DELAY_SECONDS', 60),
+                        visibility_timeout=config.get('OUTBOX_VISIBILITY_TIMEOUT_SECONDS', 300)
+                    )
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Outbox worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            # Keep draining while there is work; otherwise wait for the next poll
+            if not processed:
+                self._stop_event.wait(self.poll_interval)
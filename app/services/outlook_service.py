@@ -1,14 +1,63 @@
 import requests
 from flask import current_app
+from app.services.graph_auth import AccessTokenCache, private_key_cache
+from app.services.graph_http import GraphHttp
 import json
+import time
 import uuid
 
 class OutlookService:
+    TOKEN_CACHE_KEY = 'graph_token_cache'
+    
     @staticmethod
     def get_access_token():
-        """Get access token using SSL certificate authentication"""
+        """Get a cached access token, fetching or refreshing it when needed"""
+        app = current_app._get_current_object()
+        
+        def fetch():
+            # May run on the background refresh thread, so push our own app context
+            with app.app_context():
+                return OutlookService._request_access_token()
+        
+        return OutlookService._token_cache().get_token(fetch)
+    
+    @staticmethod
+    def invalidate_access_token(token=None):
+        """Drop a cached access token Graph rejected (401) so the next call fetches a new one"""
+        OutlookService._token_cache().invalidate(token)
+    
+    @staticmethod
+    def _token_cache():
+        """Get the access token cache for the current Flask application"""
+        app = current_app._get_current_object()
+        
+        token_cache = app.extensions.get(OutlookService.TOKEN_CACHE_KEY)
+        if token_cache is None:
+            token_cache = app.extensions.setdefault(
+                OutlookService.TOKEN_CACHE_KEY,
+                AccessTokenCache(
+                    refresh_margin=app.config.get('GRAPH_TOKEN_REFRESH_MARGIN_SECONDS', 300),
+                    expiry_skew=app.config.get('GRAPH_TOKEN_EXPIRY_SKEW_SECONDS', 60)
+                )
+            )
+        return token_cache
+    
+    @staticmethod
+    def _token_url():
+        """Token endpoint for the configured tenant"""
+        authority = current_app.config.get('AZURE_AUTHORITY_HOST') or 'https://login.microsoftonline.com'
+        return f"{authority.rstrip('/')}/{current_app.config['AZURE_TENANT_ID']}/oauth2/v2.0/token"
+    
+    @staticmethod
+    def _request_access_token():
+        """
+        Request a new access token using SSL certificate authentication
+        
+        Returns:
+            tuple: (access_token, expires_in_seconds)
+        """
         try:
-            token_url = f"https://login.microsoftonline.com/{current_app.config['AZURE_TENANT_ID']}/oauth2/v2.0/token"
+            token_url = OutlookService._token_url()
             
             data = {
                 'client_id': current_app.config['AZURE_CLIENT_ID'],
@@ -18,10 +67,11 @@ class OutlookService:
                 'grant_type': 'client_credentials'
             }
             
-            response = requests.post(token_url, data=data)
+            response = GraphHttp.session().post(token_url, data=data)
             response.raise_for_status()
             
-            return response.json()['access_token']
+            token_data = response.json()
+            return token_data['access_token'], int(token_data.get('expires_in', 3599))
         except Exception as e:
             current_app.logger.error(f"Failed to get access token: {str(e)}")
             raise
@@ -31,20 +81,18 @@ class OutlookService:
         """Create JWT assertion for certificate-based authentication"""
         import jwt
         import time
-        from cryptography.hazmat.primitives import serialization
         
         try:
-            # Load private key from certificate
-            with open(current_app.config['AZURE_CERT_PATH'], 'rb') as cert_file:
-                private_key = serialization.load_pem_private_key(
-                    cert_file.read(),
-                    password=current_app.config.get('AZURE_CERT_PASSWORD', '').encode() if current_app.config.get('AZURE_CERT_PASSWORD') else None
-                )
+            # Load private key from certificate (parsed once, reloaded when the file changes)
+            private_key = private_key_cache.get(
+                current_app.config['AZURE_CERT_PATH'],
+                password=current_app.config.get('AZURE_CERT_PASSWORD', '').encode() if current_app.config.get('AZURE_CERT_PASSWORD') else None
+            )
             
             # Create JWT payload
             now = int(time.time())
             payload = {
-                'aud': f"https://login.microsoftonline.com/{current_app.config['AZURE_TENANT_ID']}/oauth2/v2.0/token",
+                'aud': OutlookService._token_url(),
                 'exp': now + 600,  # 10 minutes
                 'iss': current_app.config['AZURE_CLIENT_ID'],
                 'jti': str(uuid.uuid4()),
@@ -67,70 +115,30 @@ class OutlookService:
     
     @staticmethod
     def create_draft(sender, subject, body, recipients=None, auto_send=False, 
-                    data_as_attachment=False, attachment_data=None):
+                    data_as_attachment=False, attachment_data=None, access_token=None):
         """Create email draft using Microsoft Graph API"""
         try:
-            access_token = OutlookService.get_access_token()
+            if access_token is None:
+                access_token = OutlookService.get_access_token()
             
             # Prepare email content
-            draft_data = {
-                'subject': subject,
-                'body': {
-                    'contentType': 'HTML',
-                    'content': body
-                },
-                'from': {
-                    'emailAddress': {
-                        'address': sender
-                    }
-                }
-            }
-            
-            # Add recipients if provided
-            if recipients:
-                draft_data['toRecipients'] = [
-                    {'emailAddress': {'address': email.strip()}} 
-                    for email in recipients if email.strip()
-                ]
-            
-            # Add attachment if specified
-            if data_as_attachment and attachment_data:
-                attachments = OutlookService._prepare_data_attachment(attachment_data)
-                if attachments:
-                    draft_data['attachments'] = attachments
-            
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            }
+            draft_data = OutlookService._build_message(
+                sender, subject, body, recipients, data_as_attachment, attachment_data
+            )
             
             # Create draft
-            if auto_send:
-                # Send email directly
-                endpoint = f"https://graph.microsoft.com/v1.0/users/{sender}/sendMail"
-                payload = {'message': draft_data}
-                response = requests.post(endpoint, json=payload, headers=headers)
-            else:
-                # Create draft
-                endpoint = f"https://graph.microsoft.com/v1.0/users/{sender}/messages"
-                response = requests.post(endpoint, json=draft_data, headers=headers)
+            method, path, payload = OutlookService._message_request(sender, draft_data, auto_send)
+            response = OutlookService._graph_request(method, path, payload, access_token)
+            
+            if response.status_code == 401:
+                # The token was rejected (revoked, clock skew): drop it and retry once with a fresh one
+                OutlookService.invalidate_access_token(access_token)
+                access_token = OutlookService.get_access_token()
+                response = OutlookService._graph_request(method, path, payload, access_token)
             
             response.raise_for_status()
             
-            if auto_send:
-                return {
-                    'success': True,
-                    'message': 'Email sent successfully',
-                    'messageId': 'sent'
-                }
-            else:
-                draft_info = response.json()
-                return {
-                    'success': True,
-                    'message': 'Draft created successfully',
-                    'draftId': draft_info.get('id'),
-                    'webLink': draft_info.get('webLink')
-                }
+            return OutlookService._success_result(auto_send, None if auto_send else response.json())
                 
         except requests.exceptions.RequestException as e:
             current_app.logger.error(f"Graph API error: {str(e)}")
@@ -145,6 +153,261 @@ class OutlookService:
                 'error': 'An unexpected error occurred'
             }
     
+    @staticmethod
+    def _graph_request(method, path, payload, access_token):
+        """Send one Graph API request with a bearer token"""
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+        return GraphHttp.session().request(method, GraphHttp.graph_url(path), json=payload, headers=headers)
+    
+    @staticmethod
+    def create_drafts_batch(messages, access_token=None):
+        """
+        Create (or send) many emails using Microsoft Graph JSON $batch requests
+        
+        Messages are grouped by sender and packed into $batch envelopes of up to
+        GRAPH_BATCH_SIZE (max 20) sub-requests. Throttled sub-requests (429/503)
+        are retried after their Retry-After delay, up to GRAPH_HTTP_MAX_RETRIES times;
+        a sub-request asking to wait longer than GRAPH_MAX_RETRY_AFTER_SECONDS fails
+        instead.
+        
+        Args:
+            messages (list): Dicts with the create_draft keyword arguments
+                (sender, subject, body, recipients, auto_send, data_as_attachment,
+                attachment_data)
+            access_token (str): Pre-fetched access token (optional)
+            
+        Returns:
+            list: Result dicts shaped like create_draft's, in the order of messages
+        """
+        results = [None] * len(messages)
+        if not messages:
+            return results
+        
+        try:
+            if access_token is None:
+                access_token = OutlookService.get_access_token()
+        except Exception as e:
+            return [{'success': False, 'error': f'Failed to create draft: {str(e)}'} for _ in messages]
+        
+        batch_size = max(1, min(current_app.config.get('GRAPH_BATCH_SIZE', 20), 20))
+        
+        # Group message indexes by sender, preserving input order within each group
+        by_sender = {}
+        for index, message in enumerate(messages):
+            by_sender.setdefault(message['sender'], []).append(index)
+        
+        for indexes in by_sender.values():
+            for start in range(0, len(indexes), batch_size):
+                chunk = indexes[start:start + batch_size]
+                for index, result in OutlookService._send_batch(messages, chunk, access_token).items():
+                    results[index] = result
+        
+        return results
+    
+    @staticmethod
+    def _send_batch(messages, indexes, access_token):
+        """
+        Send one $batch envelope, retrying throttled sub-requests
+        
+        Returns:
+            dict: Message index -> result dict
+        """
+        results = {}
+        sub_requests = {}
+        
+        for index in indexes:
+            message = messages[index]
+            try:
+                draft_data = OutlookService._build_message(
+                    message['sender'],
+                    message['subject'],
+                    message['body'],
+                    message.get('recipients'),
+                    message.get('data_as_attachment', False),
+                    message.get('attachment_data')
+                )
+                method, path, payload = OutlookService._message_request(
+                    message['sender'], draft_data, message.get('auto_send', False)
+                )
+            except Exception as e:
+                current_app.logger.error(f"Outlook service error: {str(e)}")
+                results[index] = {'success': False, 'error': 'An unexpected error occurred'}
+                continue
+            
+            sub_requests[index] = {
+                'id': str(index),
+                'method': method,
+                'url': path,
+                'body': payload,
+                'headers': {'Content-Type': 'application/json'}
+            }
+        
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+        max_retries = current_app.config.get('GRAPH_HTTP_MAX_RETRIES', 3)
+        max_retry_after = current_app.config.get('GRAPH_MAX_RETRY_AFTER_SECONDS', 10)
+        attempt = 0
+        reauthenticated = False
+        
+        def reauthenticate():
+            # The token was rejected (revoked, clock skew): drop it and continue with a fresh one
+            OutlookService.invalidate_access_token(access_token)
+            return OutlookService.get_access_token()
+        
+        while sub_requests:
+            try:
+                response = GraphHttp.session().post(
+                    GraphHttp.graph_url('/$batch'),
+                    json={'requests': list(sub_requests.values())},
+                    headers=headers
+                )
+                if response.status_code == 401 and not reauthenticated:
+                    reauthenticated = True
+                    access_token = reauthenticate()
+                    headers['Authorization'] = f'Bearer {access_token}'
+                    continue
+                response.raise_for_status()
+                responses = response.json().get('responses', [])
+            except Exception as e:
+                current_app.logger.error(f"Graph API batch error: {str(e)}")
+                for index in sub_requests:
+                    results[index] = {'success': False, 'error': f'Failed to create draft: {str(e)}'}
+                break
+            
+            throttled = {}
+            unauthorized = {}
+            retry_after = 0
+            
+            for item in responses:
+                try:
+                    index = int(item.get('id'))
+                except (TypeError, ValueError):
+                    continue
+                if index not in sub_requests:
+                    continue
+                
+                status = item.get('status', 500)
+                if 200 <= status < 300:
+                    auto_send = messages[index].get('auto_send', False)
+                    results[index] = OutlookService._success_result(auto_send, item.get('body') or {})
+                elif status == 401 and not reauthenticated:
+                    unauthorized[index] = sub_requests[index]
+                elif status in (429, 503) and attempt < max_retries:
+                    item_retry_after = OutlookService._retry_after(item)
+                    if item_retry_after > max_retry_after:
+                        # Waiting that long would hold up the calling request thread
+                        results[index] = {
+                            'success': False,
+                            'error': f"Failed to create draft: {status} throttled, Retry-After {item_retry_after:g}s exceeds the {max_retry_after:g}s limit"
+                        }
+                        continue
+                    throttled[index] = sub_requests[index]
+                    retry_after = max(retry_after, item_retry_after)
+                else:
+                    error = (item.get('body') or {}).get('error') or {}
+                    results[index] = {
+                        'success': False,
+                        'error': f"Failed to create draft: {status} {error.get('code', '')} {error.get('message', '')}".strip()
+                    }
+            
+            # Sub-requests missing from the response are reported as failures
+            for index in sub_requests:
+                if index not in results and index not in throttled and index not in unauthorized:
+                    results[index] = {'success': False, 'error': 'Failed to create draft: no response in batch'}
+            
+            if unauthorized:
+                reauthenticated = True
+                try:
+                    access_token = reauthenticate()
+                except Exception as e:
+                    current_app.logger.error(f"Graph API batch error: {str(e)}")
+                    for index in unauthorized:
+                        results[index] = {'success': False, 'error': f'Failed to create draft: {str(e)}'}
+                    unauthorized = {}
+                headers['Authorization'] = f'Bearer {access_token}'
+            
+            sub_requests = {**throttled, **unauthorized}
+            if throttled:
+                attempt += 1
+                time.sleep(retry_after)
+        
+        return results
+    
+    @staticmethod
+    def _retry_after(item):
+        """Seconds a throttled $batch sub-response asks to wait (1 when absent or unparseable)"""
+        headers = item.get('headers') or {}
+        try:
+            return max(0.0, float(headers.get('Retry-After', 1)))
+        except (TypeError, ValueError):
+            return 1.0
+    
+    @staticmethod
+    def _build_message(sender, subject, body, recipients=None, data_as_attachment=False, attachment_data=None):
+        """Build the Graph message resource for an email"""
+        draft_data = {
+            'subject': subject,
+            'body': {
+                'contentType': 'HTML',
+                'content': body
+            },
+            'from': {
+                'emailAddress': {
+                    'address': sender
+                }
+            }
+        }
+        
+        # Add recipients if provided
+        if recipients:
+            draft_data['toRecipients'] = [
+                {'emailAddress': {'address': email.strip()}} 
+                for email in recipients if email.strip()
+            ]
+        
+        # Add attachment if specified
+        if data_as_attachment and attachment_data:
+            attachments = OutlookService._prepare_data_attachment(attachment_data)
+            if attachments:
+                draft_data['attachments'] = attachments
+        
+        return draft_data
+    
+    @staticmethod
+    def _message_request(sender, draft_data, auto_send):
+        """
+        Graph request for a message
+        
+        Returns:
+            tuple: (method, path relative to GRAPH_API_BASE_URL, JSON payload)
+        """
+        if auto_send:
+            # Send email directly
+            return 'POST', f"/users/{sender}/sendMail", {'message': draft_data}
+        # Create draft
+        return 'POST', f"/users/{sender}/messages", draft_data
+    
+    @staticmethod
+    def _success_result(auto_send, draft_info):
+        """Result dict for a successfully created draft or sent email"""
+        if auto_send:
+            return {
+                'success': True,
+                'message': 'Email sent successfully',
+                'messageId': 'sent'
+            }
+        return {
+            'success': True,
+            'message': 'Draft created successfully',
+            'draftId': draft_info.get('id'),
+            'webLink': draft_info.get('webLink')
+        }
+    
     @staticmethod
     def _prepare_data_attachment(attachment_data):
         """Prepare data as email attachment in various formats"""
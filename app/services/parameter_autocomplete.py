@@ -0,0 +1,165 @@
+from app.services.parameter_registry import ParameterRegistry
+from bisect import bisect_left
+from flask import current_app
+import re
+import threading
+
+# Lengths of the name fragments (n-grams) indexed for infix matching
+GRAM_SIZES = (2, 3)
+
+# Start of each word after the first in a parameter name: after '_' or at a lower-to-upper case change
+WORD_START_PATTERN = re.compile(r'(?<=_)[^_]|(?<=[a-z0-9])[A-Z]')
+
+class AutocompleteIndex:
+    """
+    In-memory search index over parameter names
+
+    Matching is case-insensitive, like the ILIKE it replaces, and results are
+    ranked in tiers:
+
+    1. Names starting with the term (an exact name first), in name order. Names
+       are kept lower-cased in a sorted list, so this is a bisect plus a walk.
+    2. Names with a later word starting with the term ('Client' finds
+       'TradeClientName'), in order of that word. Every word start is kept in
+       a second sorted list of name suffixes.
+    3. Any other names containing the term, shortest first. The names sharing
+       the term's rarest 2- or 3-gram are walked in that order; single
+       characters walk every name.
+
+    Every tier stops as soon as the limit is reached, so common terms cost no
+    more than rare ones.
+    """
+
+    __slots__ = ('version', 'definitions', 'keys', 'word_suffixes', 'by_length', 'grams')
+
+    def __init__(self, definitions, version=None):
+        """
+        Args:
+            definitions (iterable): ParameterDefinition rows to index
+            version (int): Registry snapshot version the definitions came from
+        """
+        self.version = version
+        self.definitions = sorted(definitions, key=lambda d: (d.ParameterName.lower(), d.ParameterName))
+        self.keys = [d.ParameterName.lower() for d in self.definitions]
+
+        self.word_suffixes = sorted(
+            (key[match.start():], position)
+            for position, (definition, key) in enumerate(zip(self.definitions, self.keys))
+            for match in WORD_START_PATTERN.finditer(definition.ParameterName)
+            if match.start() > 0
+        )
+
+        # Positions shortest name first; gram posting lists keep this order
+        self.by_length = sorted(range(len(self.keys)), key=lambda position: (len(self.keys[position]), position))
+        grams = {}
+        for position in self.by_length:
+            key = self.keys[position]
+            for size in GRAM_SIZES:
+                for gram in {key[i:i + size] for i in range(len(key) - size + 1)}:
+                    grams.setdefault(gram, []).append(position)
+        self.grams = grams
+
+    def search(self, term, limit=10):
+        """
+        Find parameters whose name contains term
+
+        Args:
+            term (str): Search text (case-insensitive); empty returns the first names
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Matching ParameterDefinition rows, best match first
+        """
+        term = (term or '').lower()
+        if not term:
+            return self.definitions[:limit]
+
+        ranked = []
+        seen = set()
+
+        def add(position):
+            if position not in seen:
+                seen.add(position)
+                ranked.append(position)
+            return len(ranked) >= limit
+
+        # Tier 1: prefix matches are contiguous in the sorted names
+        position = bisect_left(self.keys, term)
+        while position < len(self.keys) and self.keys[position].startswith(term):
+            if add(position):
+                return self._results(ranked)
+            position += 1
+
+        # Tier 2: matches at a later word start are contiguous in the sorted suffixes
+        index = bisect_left(self.word_suffixes, (term,))
+        while index < len(self.word_suffixes) and self.word_suffixes[index][0].startswith(term):
+            if add(self.word_suffixes[index][1]):
+                return self._results(ranked)
+            index += 1
+
+        # Tier 3: any other occurrence, shortest names first
+        for position in self._infix_candidates(term):
+            if term in self.keys[position] and add(position):
+                break
+        return self._results(ranked)
+
+    def _infix_candidates(self, term):
+        """Positions (shortest name first) of every name that may contain term"""
+        if len(term) < min(GRAM_SIZES):
+            return self.by_length
+
+        size = min(len(term), max(GRAM_SIZES))
+        postings = []
+        for i in range(len(term) - size + 1):
+            posting = self.grams.get(term[i:i + size])
+            if posting is None:
+                return ()
+            postings.append(posting)
+        return min(postings, key=len)
+
+    def _results(self, positions):
+        return [self.definitions[position] for position in positions]
+
+class ParameterAutocomplete:
+    """
+    Autocomplete index over the active parameters, kept in step with the registry
+
+    The index is built from the ParameterRegistry snapshot and rebuilt only
+    when the snapshot version changes, so lookups never query the database
+    while the registry is fresh. One index is kept per Flask application.
+    """
+
+    EXTENSION_KEY = 'parameter_autocomplete'
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def current(cls):
+        """Get the autocomplete holder for the current Flask application"""
+        autocomplete = current_app.extensions.get(cls.EXTENSION_KEY)
+        if autocomplete is None:
+            autocomplete = current_app.extensions.setdefault(cls.EXTENSION_KEY, cls())
+        return autocomplete
+
+    def index(self):
+        """
+        Get the index for the current registry snapshot
+
+        Returns:
+            AutocompleteIndex: Index over the active parameters
+        """
+        snapshot = ParameterRegistry.current().snapshot()
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.version != snapshot.version:
+                self._index = AutocompleteIndex(snapshot.ordered, snapshot.version)
+            return self._index
+
+    def search(self, term, limit=10):
+        """Find active parameters whose name contains term, best match first"""
+        return self.index().search(term, limit)
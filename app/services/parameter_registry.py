@@ -0,0 +1,125 @@
+from app.models.parameter import Parameter
+from app import db
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import case, func
+from types import MappingProxyType
+import threading
+import time
+
+class ParameterDefinition(namedtuple('ParameterDefinition', [
+    'ParameterId', 'ParameterName', 'Description', 'DataType', 'DefaultValue',
+    'IsActive', 'CreatedBy', 'CreationTime', 'ModifiedBy', 'ModifiedTime'
+])):
+    """Immutable, session-independent copy of an active Parameter row"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_model(cls, parameter):
+        return cls(*(getattr(parameter, field) for field in cls._fields))
+
+    def to_dict(self):
+        return {
+            'Id': self.ParameterId,
+            'Name': self.ParameterName,
+            'Description': self.Description,
+            'DataType': self.DataType,
+            'DefaultValue': self.DefaultValue,
+            'IsActive': self.IsActive,
+            'CreatedBy': self.CreatedBy,
+            'CreationTime': self.CreationTime.isoformat(),
+            'ModifiedBy': self.ModifiedBy,
+            'ModifiedTime': self.ModifiedTime.isoformat() if self.ModifiedTime else None
+        }
+
+class RegistrySnapshot:
+    """Point-in-time view of the active parameters"""
+
+    __slots__ = ('version', 'watermark', 'parameters', 'ordered')
+
+    def __init__(self, version, watermark, definitions):
+        self.version = version
+        self.watermark = watermark
+        # Name -> ParameterDefinition, read-only
+        self.parameters = MappingProxyType({d.ParameterName: d for d in definitions})
+        # Definitions ordered by ParameterName
+        self.ordered = tuple(sorted(definitions, key=lambda d: d.ParameterName))
+
+class ParameterRegistry:
+    """
+    Process-local cache of active parameter definitions
+
+    The snapshot is served without touching the database until the TTL
+    (PARAMETER_REGISTRY_TTL_SECONDS) expires. After that a single aggregate
+    watermark query decides whether the Parameters table changed; the
+    definitions are only reloaded when it did. One registry is kept per
+    Flask application.
+    """
+
+    EXTENSION_KEY = 'parameter_registry'
+
+    def __init__(self, ttl_seconds=60):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def current(cls):
+        """Get the registry for the current Flask application"""
+        registry = current_app.extensions.get(cls.EXTENSION_KEY)
+        if registry is None:
+            registry = current_app.extensions.setdefault(
+                cls.EXTENSION_KEY,
+                cls(current_app.config.get('PARAMETER_REGISTRY_TTL_SECONDS', 60))
+            )
+        return registry
+
+    def snapshot(self):
+        """
+        Get the current snapshot, refreshing it if the TTL has expired
+
+        Returns:
+            RegistrySnapshot: Active parameter definitions
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+            return snapshot
+
+        # Only one thread refreshes; others keep serving the previous snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            if self._snapshot is not snapshot and self._snapshot is not None:
+                return self._snapshot
+
+            watermark = self._read_watermark()
+            if snapshot is None or watermark != snapshot.watermark:
+                self._version += 1
+                definitions = [
+                    ParameterDefinition.from_model(param)
+                    for param in Parameter.query.filter_by(IsActive=True).all()
+                ]
+                self._snapshot = RegistrySnapshot(self._version, watermark, definitions)
+
+            self._checked_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Force the next snapshot() call to re-check the database"""
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _read_watermark():
+        """Aggregate that changes whenever a parameter is added, removed, modified or (de)activated"""
+        row = db.session.query(
+            func.count(Parameter.ParameterId),
+            func.sum(case((Parameter.IsActive == True, 1), else_=0)),
+            func.max(Parameter.CreationTime),
+            func.max(Parameter.ModifiedTime)
+        ).one()
+        return tuple(row)
@@ -1,4 +1,6 @@
-from app.models.parameter import Parameter
+from app.services.parameter_registry import ParameterRegistry
+from app.services.parameter_autocomplete import ParameterAutocomplete
+from app.services.template_engine import TemplateEngine
 from app import db
 import re
 from datetime import datetime
@@ -8,18 +10,17 @@ class ParameterService:
     @staticmethod
     def get_all_parameters():
         """Get all active parameters"""
-        parameters = Parameter.query.filter_by(IsActive=True).order_by(Parameter.ParameterName).all()
-        return [param.to_dict() for param in parameters]
+        return [param.to_dict() for param in ParameterRegistry.current().snapshot().ordered]
     
     @staticmethod
-    def get_parameters_for_autocomplete(search_term=None):
-        """Get parameters formatted for autocomplete dropdown"""
-        query = Parameter.query.filter_by(IsActive=True)
-        
-        if search_term:
-            query = query.filter(Parameter.ParameterName.ilike(f'%{search_term}%'))
+    def get_parameters_for_autocomplete(search_term=None, limit=10):
+        """
+        Get parameters formatted for autocomplete dropdown
         
-        parameters = query.order_by(Parameter.ParameterName).limit(10).all()
+        Served from the in-memory ParameterAutocomplete index (case-insensitive
+        prefix and infix matches on the name, best match first).
+        """
+        parameters = ParameterAutocomplete.current().search(search_term, limit)
         
         return [{
             'value': param.ParameterName,
@@ -42,7 +43,7 @@ class ParameterService:
             return True, []
         
         # Get all valid parameter names
-        valid_parameters = {param.ParameterName for param in Parameter.query.filter_by(IsActive=True).all()}
+        valid_parameters = ParameterService._get_parameter_definitions()
         
         # Check for invalid parameters
         invalid_parameters = [param for param in found_parameters if param not in valid_parameters]
@@ -73,26 +74,37 @@ class ParameterService:
         if not text:
             return text, [], []
         
-        # Find all @@parameter patterns
-        parameter_pattern = r'@@([A-Za-z][A-Za-z0-9_]*)'
-        found_parameters = re.findall(parameter_pattern, text)
+        return ParameterService.render_compiled(
+            TemplateEngine.compile(text), parameter_values, use_defaults
+        )
+    
+    @staticmethod
+    def render_compiled(compiled, parameter_values, use_defaults=True, db_parameters=None):
+        """
+        Render a compiled template with parameter values
         
-        if not found_parameters:
-            return text, [], []
+        Args:
+            compiled (CompiledTemplate): Template text compiled by TemplateEngine
+            parameter_values (dict): Dictionary of parameter names to values
+            use_defaults (bool): Whether to use default values for missing parameters
+            db_parameters (dict): Active parameter definitions by name; loaded if not given
+            
+        Returns:
+            tuple: (processed_text, missing_parameters, replacement_log)
+        """
+        if not compiled.parameters:
+            return compiled.render({}), [], []
         
-        # Get parameter definitions from database
-        db_parameters = {
-            param.ParameterName: param 
-            for param in Parameter.query.filter_by(IsActive=True).all()
-        }
+        # Get parameter definitions from the registry
+        if db_parameters is None:
+            db_parameters = ParameterService._get_parameter_definitions()
         
         missing_parameters = []
         replacement_log = []
-        processed_text = text
+        formatted_values = {}
         
         # Process each unique parameter found
-        for param_name in set(found_parameters):
-            param_pattern = f'@@{param_name}'
+        for param_name in compiled.parameters:
             replacement_value = None
             source = None
             
@@ -107,14 +119,14 @@ class ParameterService:
                     replacement_value = db_param.DefaultValue
                     source = 'default'
             
-            # Perform replacement or track missing parameter
+            # Record replacement or track missing parameter
             if replacement_value is not None:
                 # Convert value to string and handle data type formatting
                 formatted_value = ParameterService._format_parameter_value(
                     replacement_value, 
                     db_parameters.get(param_name)
                 )
-                processed_text = processed_text.replace(param_pattern, formatted_value)
+                formatted_values[param_name] = formatted_value
                 replacement_log.append({
                     'parameter': param_name,
                     'value': formatted_value,
@@ -130,7 +142,12 @@ class ParameterService:
                     'original_value': None
                 })
         
-        return processed_text, missing_parameters, replacement_log
+        return compiled.render(formatted_values), missing_parameters, replacement_log
+    
+    @staticmethod
+    def _get_parameter_definitions():
+        """Get active parameter definitions keyed by parameter name"""
+        return ParameterRegistry.current().snapshot().parameters
     
     @staticmethod
     def _format_parameter_value(value, parameter_definition):
@@ -234,14 +251,60 @@ class ParameterService:
         Returns:
             dict: Processing results with subject, body, and metadata
         """
+        return ParameterService.prepare_compiled_content(
+            TemplateEngine.compile(subject_template),
+            TemplateEngine.compile(body_template),
+            parameter_values,
+            use_defaults
+        )
+    
+    @staticmethod
+    def prepare_template_content(template, parameter_values, use_defaults=True, db_parameters=None):
+        """
+        Process a stored template using its cached compiled subject and body
+        
+        Args:
+            template: Template model instance
+            parameter_values (dict): Parameter values to substitute
+            use_defaults (bool): Whether to use default values for missing parameters
+            db_parameters (dict): Active parameter definitions by name; loaded if not given
+            
+        Returns:
+            dict: Processing results with subject, body, and metadata
+        """
+        compiled = TemplateEngine.compile_template(template)
+        return ParameterService.prepare_compiled_content(
+            compiled.subject, compiled.body, parameter_values, use_defaults, db_parameters
+        )
+    
+    @staticmethod
+    def prepare_compiled_content(compiled_subject, compiled_body, parameter_values,
+                                 use_defaults=True, db_parameters=None):
+        """
+        Render compiled subject and body templates
+        
+        Args:
+            compiled_subject (CompiledTemplate): Compiled email subject
+            compiled_body (CompiledTemplate): Compiled email body
+            parameter_values (dict): Parameter values to substitute
+            use_defaults (bool): Whether to use default values for missing parameters
+            db_parameters (dict): Active parameter definitions by name; loaded if not given
+            
+        Returns:
+            dict: Processing results with subject, body, and metadata
+        """
+        # Load parameter definitions once for both subject and body
+        if db_parameters is None and (compiled_subject.parameters or compiled_body.parameters):
+            db_parameters = ParameterService._get_parameter_definitions()
+        
         # Process subject
-        processed_subject, missing_subject, subject_log = ParameterService.replace_parameters_in_text(
-            subject_template, parameter_values, use_defaults
+        processed_subject, missing_subject, subject_log = ParameterService.render_compiled(
+            compiled_subject, parameter_values, use_defaults, db_parameters
         )
         
         # Process body
-        processed_body, missing_body, body_log = ParameterService.replace_parameters_in_text(
-            body_template, parameter_values, use_defaults
+        processed_body, missing_body, body_log = ParameterService.render_compiled(
+            compiled_body, parameter_values, use_defaults, db_parameters
         )
         
         # Combine missing parameters
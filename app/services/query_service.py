@@ -1,10 +1,99 @@
 from app.models.template import Template
+from app.services.search_service import SearchService, parse_search_terms
+from app.utils.cache import LRUCache
 from app import db
-from sqlalchemy import and_, or_, not_, text
+from flask import current_app
+from sqlalchemy import and_, or_, not_, text, case, func, literal, select, cast, union_all, String
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only
 import re
+import json
+import base64
+import time
 from datetime import datetime
 
+class TemplateCountCache:
+    """
+    Process-local cache of template counts
+    
+    Counts are keyed by the accessible applications plus the normalized
+    filters. Template writes through the API bump the cache version, which
+    makes every cached count stale at once. QUERY_COUNT_CACHE_TTL_SECONDS
+    bounds how long writes made by other processes can go unnoticed. Stale
+    counts younger than QUERY_COUNT_STALE_SECONDS may still be served as
+    estimates. One cache is kept per Flask application.
+    """
+    
+    EXTENSION_KEY = 'template_count_cache'
+    
+    def __init__(self, ttl_seconds=30, stale_seconds=300, maxsize=1024):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries = LRUCache(maxsize)
+        self._version = 0
+    
+    @classmethod
+    def current(cls):
+        """Get the cache for the current Flask application"""
+        cache = current_app.extensions.get(cls.EXTENSION_KEY)
+        if cache is None:
+            config = current_app.config
+            cache = current_app.extensions.setdefault(cls.EXTENSION_KEY, cls(
+                ttl_seconds=config.get('QUERY_COUNT_CACHE_TTL_SECONDS', 30),
+                stale_seconds=config.get('QUERY_COUNT_STALE_SECONDS', 300),
+                maxsize=config.get('QUERY_COUNT_CACHE_SIZE', 1024)
+            ))
+        return cache
+    
+    @property
+    def version(self):
+        """Current version; read it before counting and pass it to set()"""
+        return self._version
+    
+    def get(self, key):
+        """
+        Look up a cached count
+        
+        Returns:
+            tuple: (total, is_current) or None if nothing usable is cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        version, stored_at, total = entry
+        age = time.monotonic() - stored_at
+        if version == self._version and age < self.ttl_seconds:
+            return total, True
+        if age < self.stale_seconds:
+            return total, False
+        return None
+    
+    def set(self, key, total, version):
+        """Store a count computed while the cache was at version"""
+        self._entries.set(key, (version, time.monotonic(), total))
+    
+    def invalidate(self):
+        """Mark every cached count stale (call after template writes)"""
+        self._version += 1
+
+class FilterPlan:
+    """
+    Filters compiled once into a single SQLAlchemy predicate
+    
+    Plans are cached per Flask application by the normalized filter JSON, so a
+    repeated filter set is validated and built only once. The predicate is
+    None when no filter applies.
+    """
+    
+    __slots__ = ('condition', 'errors', 'uses_search', 'search_ready')
+    
+    def __init__(self, condition, errors, uses_search, search_ready):
+        self.condition = condition
+        self.errors = errors
+        self.uses_search = uses_search
+        self.search_ready = search_ready
+
 class QueryService:
     """Service for handling dynamic template queries with filtering"""
     
@@ -38,29 +127,83 @@ class QueryService:
         'in': 'IN',          # In list
         'not_in': 'NOT IN',  # Not in list
         'is_null': 'IS NULL',     # Is null
-        'is_not_null': 'IS NOT NULL'  # Is not null
+        'is_not_null': 'IS NOT NULL',  # Is not null
+        'search': 'SEARCH'   # Full-text search (Subject and Body only)
     }
     
+    # How paged queries report the total: exact COUNT, bounded COUNT, or not at all
+    TOTAL_MODES = ('exact', 'estimate', 'none')
+    
+    PAGINATION_MODES = ('offset', 'cursor')
+    
+    # Filter groups and their nesting limits
+    FILTER_GROUP_KEYS = ('and', 'or', 'not')
+    MAX_FILTER_DEPTH = 8
+    MAX_FILTER_CONDITIONS = 100
+    
+    FILTER_PLAN_CACHE_KEY = 'query_filter_plans'
+    
+    # Fields the facets endpoint can group by
+    FACET_FIELDS = ('application_name', 'ssg_team', 'recipient_type', 'auto_send', 'created_by')
+    
     @classmethod
     def query_templates(cls, user_entitlements, filters=None, sort_by=None, 
-                       sort_order='asc', page=1, page_size=50):
+                       sort_order='asc', page=1, page_size=50, cursor=None,
+                       pagination='offset', total_mode=None, fields=None):
         """
         Query templates with dynamic filtering based on user entitlements
         
+        Offset pagination pages with OFFSET/LIMIT. Cursor pagination seeks past
+        the (sort value, EmailTemplateId) of the previous page's last row, so
+        every page costs the same; pass the returned next_cursor to get the
+        next page.
+        
         Args:
             user_entitlements: List of user entitlements
             filters: Dictionary of filter conditions
             sort_by: Field to sort by
             sort_order: 'asc' or 'desc'
-            page: Page number (1-based)
+            page: Page number (1-based, offset pagination only)
             page_size: Number of items per page
+            cursor: Opaque cursor from a previous page (implies cursor pagination)
+            pagination: 'offset' or 'cursor'
+            total_mode: 'exact', 'estimate' or 'none' (defaults to 'exact' for
+                offset pagination and 'none' for cursor pagination); totals
+                are served from the count cache when possible
+            fields: Template.to_dict() keys to return (comma-separated string or
+                list); only those columns are loaded from the database
+        
+        Raises:
+            ValueError: If the cursor, a pagination option or a field is invalid
         """
+        if cursor:
+            pagination = 'cursor'
+        if pagination not in cls.PAGINATION_MODES:
+            raise ValueError(f"pagination must be one of: {', '.join(cls.PAGINATION_MODES)}")
+        
+        if total_mode is None:
+            total_mode = 'none' if pagination == 'cursor' else 'exact'
+        if total_mode not in cls.TOTAL_MODES:
+            raise ValueError(f"total must be one of: {', '.join(cls.TOTAL_MODES)}")
+        
+        sort_key, descending = cls._resolve_sort(sort_by, sort_order)
+        seek = cls.decode_cursor(cursor, sort_key, descending) if cursor else None
+        fields = Template.resolve_fields(fields)
+        
         try:
             # Get applications user has read access to
             from app.services.auth_service import AuthService
             accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
             
             if not accessible_apps:
+                if pagination == 'cursor':
+                    return {
+                        'data': [],
+                        'total': 0,
+                        'page_size': page_size,
+                        'next_cursor': None,
+                        'has_more': False
+                    }
                 return {
                     'data': [],
                     'total': 0,
@@ -76,71 +219,540 @@ class QueryService:
             if filters:
                 query = cls._apply_filters(query, filters)
             
-            # Apply sorting
-            if sort_by and sort_by in cls.ALLOWED_FIELDS:
-                field = cls.ALLOWED_FIELDS[sort_by]
-                if sort_order.lower() == 'desc':
-                    query = query.order_by(field.desc())
-                else:
-                    query = query.order_by(field.asc())
-            else:
-                # Default sorting
-                query = query.order_by(Template.CreationTime.desc())
+            # Count before sorting and pagination
+            total, total_is_estimate = cls._count(
+                query, total_mode, cls._count_key(accessible_apps, filters)
+            )
             
-            # Get total count before pagination
-            total = query.count()
+            # Apply sorting (EmailTemplateId breaks ties so pages are stable)
+            query = query.order_by(*cls._order_by(sort_key, descending))
+            
+            # Sparse fieldset: load only the requested columns (plus the cursor's sort column)
+            if fields:
+                columns = Template.load_only_columns(fields)
+                if pagination == 'cursor':
+                    columns.append(cls.ALLOWED_FIELDS[sort_key])
+                query = query.options(load_only(*columns))
+            
+            if pagination == 'cursor':
+                if seek is not None:
+                    query = query.filter(cls._seek_condition(sort_key, descending, *seek))
+                
+                # One extra row tells us whether another page exists
+                templates = query.limit(page_size + 1).all()
+                has_more = len(templates) > page_size
+                templates = templates[:page_size]
+                
+                next_cursor = None
+                if has_more and templates:
+                    last = templates[-1]
+                    next_cursor = cls.encode_cursor(
+                        sort_key, descending,
+                        getattr(last, cls.ALLOWED_FIELDS[sort_key].key),
+                        last.EmailTemplateId
+                    )
+                
+                result = {
+                    'data': [template.to_dict(fields) for template in templates],
+                    'page_size': page_size,
+                    'next_cursor': next_cursor,
+                    'has_more': has_more
+                }
+            else:
+                # Apply pagination
+                offset = (page - 1) * page_size
+                query = query.offset(offset).limit(page_size)
+                
+                # Execute query
+                templates = query.all()
+                
+                result = {
+                    'data': [template.to_dict(fields) for template in templates],
+                    'page': page,
+                    'page_size': page_size
+                }
+                if total is not None:
+                    result['total_pages'] = (total + page_size - 1) // page_size
             
-            # Apply pagination
-            offset = (page - 1) * page_size
-            query = query.offset(offset).limit(page_size)
+            if total_mode != 'none':
+                result['total'] = total
+                result['total_is_estimate'] = total_is_estimate
             
-            # Execute query
-            templates = query.all()
+            if fields:
+                result['fields'] = fields
             
-            return {
-                'data': [template.to_dict() for template in templates],
-                'total': total,
-                'page': page,
-                'page_size': page_size,
-                'total_pages': (total + page_size - 1) // page_size,
+            result.update({
                 'filters_applied': filters,
                 'sort_by': sort_by,
                 'sort_order': sort_order
-            }
+            })
+            return result
             
         except Exception as e:
             raise Exception(f"Query execution failed: {str(e)}")
     
+    # Columns (and output keys, matching Template.to_dict) read by streaming exports
+    EXPORT_COLUMNS = tuple(
+        (key, getattr(Template, attribute)) for key, attribute in Template.DICT_FIELDS.items()
+    )
+    
     @classmethod
-    def _apply_filters(cls, query, filters):
-        """Apply dynamic filters to the query"""
-        conditions = []
+    def stream_templates(cls, user_entitlements, filters=None, sort_by=None,
+                         sort_order='asc', chunk_size=1000, iso_dates=True):
+        """
+        Stream every template matching the filters, without a row limit
         
-        for filter_item in filters:
-            if not isinstance(filter_item, dict):
-                continue
-                
-            field = filter_item.get('field')
-            operator = filter_item.get('operator', 'eq')
-            value = filter_item.get('value')
+        Access is resolved and the query built before this returns; rows are
+        then fetched lazily in chunks of chunk_size from a server-side cursor as
+        the returned iterator is consumed, so memory use does not grow with the
+        result size. Only plain column values are selected (no ORM objects).
+        
+        Args:
+            user_entitlements: List of user entitlements
+            filters: Dictionary of filter conditions
+            sort_by: Field to sort by
+            sort_order: 'asc' or 'desc'
+            chunk_size: Rows fetched per round trip
+            iso_dates: Render datetimes as ISO 8601 strings (False keeps datetime objects)
+            
+        Returns:
+            iterator: Dicts with the same keys as Template.to_dict()
+        """
+        from app.services.auth_service import AuthService
+        accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
+        
+        if not accessible_apps:
+            return iter(())
+        
+        keys = [key for key, _ in cls.EXPORT_COLUMNS]
+        query = db.session.query(*[column for _, column in cls.EXPORT_COLUMNS])\
+                          .filter(Template.ApplicationName.in_(accessible_apps))
+        
+        if filters:
+            query = cls._apply_filters(query, filters)
+        
+        query = query.order_by(*cls._order_by(*cls._resolve_sort(sort_by, sort_order)))\
+                     .yield_per(chunk_size)
+        
+        def rows():
+            for row in query:
+                record = dict(zip(keys, row))
+                if iso_dates:
+                    for key in ('CreationTime', 'ModifiedTime'):
+                        if record[key] is not None:
+                            record[key] = record[key].isoformat()
+                yield record
+        
+        return rows()
+    
+    @classmethod
+    def _resolve_sort(cls, sort_by, sort_order):
+        """
+        Resolve the requested sort to (field key, descending)
+        
+        Unknown fields fall back to the default sort (newest first).
+        """
+        if sort_by and sort_by in cls.ALLOWED_FIELDS:
+            return sort_by, (sort_order or 'asc').lower() == 'desc'
+        return 'creation_time', True
+    
+    @classmethod
+    def _order_by(cls, sort_key, descending):
+        """ORDER BY clauses for a sort; NULLs sort as the lowest value"""
+        field = cls.ALLOWED_FIELDS[sort_key]
+        direction = (lambda column: column.desc()) if descending else (lambda column: column.asc())
+        
+        clauses = []
+        if field.expression.nullable:
+            # Portable NULLs-lowest ordering (SQL Server has no NULLS FIRST/LAST)
+            clauses.append(direction(case((field.is_(None), 0), else_=1)))
+        clauses.append(direction(field))
+        clauses.append(direction(Template.EmailTemplateId))
+        return clauses
+    
+    @classmethod
+    def _seek_condition(cls, sort_key, descending, value, template_id):
+        """Condition selecting the rows after (value, template_id) in sort order"""
+        field = cls.ALLOWED_FIELDS[sort_key]
+        nullable = field.expression.nullable
+        if value is not None:
+            # Bind explicitly so boolean sort values compare like any other value
+            value = literal(value, field.expression.type)
+        
+        if descending:
+            after_id = Template.EmailTemplateId < template_id
+            if value is None:
+                return and_(field.is_(None), after_id)
+            conditions = [field < value, and_(field == value, after_id)]
+            if nullable:
+                conditions.append(field.is_(None))
+            return or_(*conditions)
+        
+        after_id = Template.EmailTemplateId > template_id
+        if value is None:
+            return or_(and_(field.is_(None), after_id), field.isnot(None))
+        return or_(field > value, and_(field == value, after_id))
+    
+    @staticmethod
+    def encode_cursor(sort_key, descending, value, template_id):
+        """
+        Encode the position after a row as an opaque, URL-safe cursor
+        
+        Args:
+            sort_key: Sort field key
+            descending: Sort direction
+            value: The row's sort value
+            template_id: The row's EmailTemplateId
+            
+        Returns:
+            str: Cursor string
+        """
+        if isinstance(value, datetime):
+            value = {'dt': value.isoformat()}
+        payload = json.dumps(
+            {'s': sort_key, 'd': descending, 'v': value, 'id': template_id},
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor, sort_key, descending):
+        """
+        Decode a cursor produced by encode_cursor for the same sort
+        
+        Returns:
+            tuple: (sort value, EmailTemplateId)
+            
+        Raises:
+            ValueError: If the cursor is malformed or was issued for a different sort
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            value = payload['v']
+            template_id = payload['id']
+            if isinstance(value, dict):
+                value = datetime.fromisoformat(value['dt'])
+        except (ValueError, TypeError, KeyError, UnicodeError):
+            raise ValueError('Invalid cursor')
+        
+        if payload.get('s') != sort_key or payload.get('d') != descending or not isinstance(template_id, str):
+            raise ValueError('Cursor does not match the requested sort')
+        
+        return value, template_id
+    
+    @classmethod
+    def count_templates(cls, user_entitlements, filters=None, mode='exact'):
+        """
+        Count templates matching the filters
+        
+        Args:
+            user_entitlements: List of user entitlements
+            filters: Dictionary of filter conditions
+            mode: 'exact', or 'estimate' to accept a recently stale cached
+                count or a count bounded by QUERY_TOTAL_ESTIMATE_CAP
+        
+        Returns:
+            tuple: (count, whether the count is an estimate)
+        
+        Raises:
+            ValueError: If mode is invalid
+        """
+        if mode not in ('exact', 'estimate'):
+            raise ValueError("mode must be one of: exact, estimate")
+        
+        try:
+            from app.services.auth_service import AuthService
+            accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
+            
+            if not accessible_apps:
+                return 0, False
+            
+            query = Template.query.filter(Template.ApplicationName.in_(accessible_apps))
+            if filters:
+                query = cls._apply_filters(query, filters)
+            
+            return cls._count(query, mode, cls._count_key(accessible_apps, filters))
+            
+        except Exception as e:
+            raise Exception(f"Count query failed: {str(e)}")
+    
+    @classmethod
+    def facet_templates(cls, user_entitlements, filters=None, fields=None):
+        """
+        Count templates matching the filters grouped by each facet field
+        
+        All facets are computed in one round trip (a UNION ALL of GROUP BY
+        queries) and cached with the template counts, so template writes
+        invalidate them.
+        
+        Args:
+            user_entitlements: List of user entitlements
+            filters: Dictionary of filter conditions
+            fields: Facet fields to compute (defaults to all FACET_FIELDS)
+        
+        Returns:
+            dict: Field -> list of {'value', 'count'}, most frequent first
+        
+        Raises:
+            ValueError: If a field is not a facet field
+        """
+        fields = list(fields or cls.FACET_FIELDS)
+        invalid = [field for field in fields if field not in cls.FACET_FIELDS]
+        if invalid:
+            raise ValueError(f"Cannot facet on: {', '.join(invalid)}. Allowed: {', '.join(cls.FACET_FIELDS)}")
+        
+        try:
+            from app.services.auth_service import AuthService
+            accessible_apps = AuthService.get_user_applications(user_entitlements, 'read')
+            
+            facets = {field: [] for field in fields}
+            if not accessible_apps:
+                return facets
+            
+            cache = TemplateCountCache.current()
+            cache_key = ('facets', tuple(fields)) + cls._count_key(accessible_apps, filters)
+            cached = cache.get(cache_key)
+            if cached is not None and cached[1]:
+                return cached[0]
+            version = cache.version
+            
+            conditions = [Template.ApplicationName.in_(accessible_apps)]
+            if filters:
+                condition = cls.compile_filters(filters).condition
+                if condition is not None:
+                    conditions.append(condition)
+            
+            statement = union_all(*[
+                select(
+                    literal(field).label('facet'),
+                    cast(cls.ALLOWED_FIELDS[field], String(200)).label('value'),
+                    func.count().label('count')
+                ).where(*conditions).group_by(cls.ALLOWED_FIELDS[field])
+                for field in fields
+            ])
             
-            # Validate field and operator
-            if field not in cls.ALLOWED_FIELDS or operator not in cls.ALLOWED_OPERATORS:
-                continue
+            for field, value, count in db.session.execute(statement):
+                if value is not None and isinstance(cls.ALLOWED_FIELDS[field].expression.type, db.Boolean):
+                    value = value.lower() in ('1', 'true')
+                facets[field].append({'value': value, 'count': count})
             
-            # Get SQLAlchemy field
-            db_field = cls.ALLOWED_FIELDS[field]
+            for values in facets.values():
+                values.sort(key=lambda item: (-item['count'], str(item['value'])))
+            
+            cache.set(cache_key, facets, version)
+            return facets
+            
+        except Exception as e:
+            raise Exception(f"Facet query failed: {str(e)}")
+    
+    @staticmethod
+    def invalidate_counts():
+        """Mark cached template counts stale after templates are created, changed or deleted"""
+        TemplateCountCache.current().invalidate()
+    
+    @staticmethod
+    def _count_key(accessible_apps, filters):
+        """Cache key for a count: accessible applications plus normalized filters"""
+        normalized_filters = sorted(
+            json.dumps(filter_item, sort_keys=True, default=str) for filter_item in (filters or [])
+        )
+        return tuple(sorted(accessible_apps)), tuple(normalized_filters)
+    
+    @staticmethod
+    def _count(query, total_mode, cache_key):
+        """
+        Count the rows matched by a filtered query
+        
+        Exact counts are served from the TemplateCountCache while current.
+        'estimate' also accepts a recently stale cached count, and otherwise
+        stops counting at QUERY_TOTAL_ESTIMATE_CAP rows so wide filters do not
+        scan the whole table just to report a total.
+        
+        Returns:
+            tuple: (total or None, whether the total is an estimate)
+        """
+        if total_mode == 'none':
+            return None, False
+        
+        cache = TemplateCountCache.current()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            total, is_current = cached
+            if is_current:
+                return total, False
+            if total_mode == 'estimate':
+                return total, True
+        
+        version = cache.version
+        query = query.order_by(None)
+        if total_mode == 'exact':
+            total = query.with_entities(func.count(Template.EmailTemplateId)).scalar()
+            cache.set(cache_key, total, version)
+            return total, False
+        
+        cap = current_app.config.get('QUERY_TOTAL_ESTIMATE_CAP', 10000)
+        bounded = query.with_entities(Template.EmailTemplateId).limit(cap + 1).subquery()
+        total = db.session.query(func.count()).select_from(bounded).scalar()
+        if total > cap:
+            return cap, True
+        
+        # Below the cap the bounded count is exact
+        cache.set(cache_key, total, version)
+        return total, False
+    
+    @classmethod
+    def _apply_filters(cls, query, filters):
+        """Apply dynamic filters to the query (invalid filters are skipped)"""
+        condition = cls.compile_filters(filters).condition
+        if condition is not None:
+            query = query.filter(condition)
+        return query
+    
+    @classmethod
+    def compile_filters(cls, filters):
+        """
+        Validate and compile filters into one predicate, reusing cached plans
+        
+        Filters are a list of conditions ANDed together. Any entry may instead be
+        a group: {"and": [...]}, {"or": [...]} or {"not": {...}}, nested up to
+        MAX_FILTER_DEPTH levels with at most MAX_FILTER_CONDITIONS conditions.
+        
+        Args:
+            filters: List of filter conditions and groups
             
-            # Build condition based on operator
-            condition = cls._build_condition(db_field, operator, value)
+        Returns:
+            FilterPlan: Compiled predicate plus any validation errors
+        """
+        cache = current_app.extensions.get(cls.FILTER_PLAN_CACHE_KEY)
+        if cache is None:
+            cache = current_app.extensions.setdefault(
+                cls.FILTER_PLAN_CACHE_KEY,
+                LRUCache(current_app.config.get('QUERY_FILTER_PLAN_CACHE_SIZE', 512))
+            )
+        
+        key = json.dumps(filters, sort_keys=True, default=str)
+        plan = cache.get(key)
+        
+        # Search predicates depend on whether the full-text index exists yet
+        if plan is not None and (not plan.uses_search or plan.search_ready == SearchService.is_index_ready()):
+            return plan
+        
+        state = {'errors': [], 'conditions': 0, 'uses_search': False}
+        if isinstance(filters, list):
+            condition = cls._compile_group('and', filters, 'Filter', 1, state)
+        else:
+            state['errors'].append("Filters must be a list of filter objects")
+            condition = None
+        
+        plan = FilterPlan(
+            condition,
+            tuple(state['errors']),
+            state['uses_search'],
+            SearchService.is_index_ready() if state['uses_search'] else None
+        )
+        cache.set(key, plan)
+        return plan
+    
+    @classmethod
+    def _compile_group(cls, group_type, items, label, depth, state):
+        """Compile the members of an and/or group; the top-level list is an 'and' group labelled 'Filter'"""
+        conditions = []
+        for i, item in enumerate(items):
+            item_label = f"{label} {i}" if label == 'Filter' else f"{label}.{group_type}[{i}]"
+            condition = cls._compile_node(item, item_label, depth, state)
             if condition is not None:
                 conditions.append(condition)
         
-        # Apply conditions with AND logic by default
-        if conditions:
-            query = query.filter(and_(*conditions))
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return and_(*conditions) if group_type == 'and' else or_(*conditions)
+    
+    @classmethod
+    def _compile_node(cls, node, label, depth, state):
+        """Compile a single filter condition or and/or/not group"""
+        errors = state['errors']
         
-        return query
+        if not isinstance(node, dict):
+            errors.append(f"{label} must be an object")
+            return None
+        
+        group_keys = [key for key in cls.FILTER_GROUP_KEYS if key in node]
+        if group_keys:
+            if len(node) != 1:
+                errors.append(f"{label}: a group must have exactly one of {', '.join(cls.FILTER_GROUP_KEYS)} and nothing else")
+                return None
+            if depth >= cls.MAX_FILTER_DEPTH:
+                errors.append(f"{label}: filter groups are nested more than {cls.MAX_FILTER_DEPTH} levels deep")
+                return None
+            
+            group_type = group_keys[0]
+            members = node[group_type]
+            
+            if group_type == 'not':
+                if not isinstance(members, dict):
+                    errors.append(f"{label}: 'not' must contain a single filter object")
+                    return None
+                condition = cls._compile_node(members, f"{label}.not", depth + 1, state)
+                return not_(condition) if condition is not None else None
+            
+            if not isinstance(members, list) or not members:
+                errors.append(f"{label}: '{group_type}' must be a non-empty list of filters")
+                return None
+            return cls._compile_group(group_type, members, label, depth + 1, state)
+        
+        state['conditions'] += 1
+        if state['conditions'] > cls.MAX_FILTER_CONDITIONS:
+            if state['conditions'] == cls.MAX_FILTER_CONDITIONS + 1:
+                errors.append(f"Filters may contain at most {cls.MAX_FILTER_CONDITIONS} conditions")
+            return None
+        
+        error = cls._validate_condition(node, label)
+        if error:
+            errors.append(error)
+            return None
+        
+        operator = node.get('operator', 'eq')
+        if operator == 'search':
+            state['uses_search'] = True
+        condition = cls._build_condition(cls.ALLOWED_FIELDS[node['field']], operator, node.get('value'))
+        if condition is None:
+            # Dropping the branch would silently widen a 'not' or narrow an 'or'
+            raise ValueError(f"{label}: value is not valid for operator '{operator}'")
+        return condition
+    
+    @classmethod
+    def _validate_condition(cls, filter_item, label):
+        """Validate a single filter condition; returns an error message or None"""
+        if 'field' not in filter_item:
+            return f"{label} missing required 'field' property"
+        
+        field = filter_item['field']
+        operator = filter_item.get('operator', 'eq')
+        
+        if field not in cls.ALLOWED_FIELDS:
+            return f"{label}: '{field}' is not an allowed field"
+        
+        if operator not in cls.ALLOWED_OPERATORS:
+            return f"{label}: '{operator}' is not an allowed operator"
+        
+        # Validate value is provided for operators that need it
+        if operator not in ['is_null', 'is_not_null'] and 'value' not in filter_item:
+            return f"{label}: 'value' is required for operator '{operator}'"
+        
+        if operator in ('in', 'not_in') and not isinstance(filter_item['value'], list):
+            return f"{label}: '{operator}' requires a list of values"
+        
+        if operator == 'search':
+            if field not in SearchService.SEARCHABLE_FIELDS:
+                return f"{label}: 'search' is only supported on {', '.join(SearchService.SEARCHABLE_FIELDS)}"
+            value = filter_item['value']
+            if not isinstance(value, str) or not any(parse_search_terms(value)):
+                return f"{label}: 'search' requires a non-empty search string"
+        
+        return None
     
     @classmethod
     def _build_condition(cls, field, operator, value):
@@ -172,6 +784,8 @@ class QueryService:
                 return field.is_(None)
             elif operator == 'is_not_null':
                 return field.isnot(None)
+            elif operator == 'search':
+                return SearchService.condition(field.key, value)
             
             return None
         except Exception:
@@ -195,8 +809,11 @@ class QueryService:
                 'in': 'In list of values',
                 'not_in': 'Not in list of values',
                 'is_null': 'Is null/empty',
-                'is_not_null': 'Is not null/empty'
+                'is_not_null': 'Is not null/empty',
+                'search': 'Contains all words (full-text; @@Name matches parameter references)'
             },
+            'searchable_fields': list(SearchService.SEARCHABLE_FIELDS),
+            'filter_groups': list(cls.FILTER_GROUP_KEYS),
             'field_types': {
                 'application_name': 'string',
                 'ssg_team': 'string',
@@ -216,28 +833,12 @@ class QueryService:
     
     @classmethod
     def validate_filters(cls, filters):
-        """Validate filter structure and content"""
+        """Validate filter structure and content (including nested and/or/not groups)"""
         if not isinstance(filters, list):
             return False, "Filters must be a list of filter objects"
         
-        for i, filter_item in enumerate(filters):
-            if not isinstance(filter_item, dict):
-                return False, f"Filter {i} must be an object"
-            
-            if 'field' not in filter_item:
-                return False, f"Filter {i} missing required 'field' property"
-            
-            field = filter_item['field']
-            operator = filter_item.get('operator', 'eq')
-            
-            if field not in cls.ALLOWED_FIELDS:
-                return False, f"Filter {i}: '{field}' is not an allowed field"
-            
-            if operator not in cls.ALLOWED_OPERATORS:
-                return False, f"Filter {i}: '{operator}' is not an allowed operator"
-            
-            # Validate value is provided for operators that need it
-            if operator not in ['is_null', 'is_not_null'] and 'value' not in filter_item:
-                return False, f"Filter {i}: 'value' is required for operator '{operator}'"
+        plan = cls.compile_filters(filters)
+        if plan.errors:
+            return False, plan.errors[0]
         
-        return True, "Filters are valid"
\ No newline at end of file
+        return True, "Filters are valid"
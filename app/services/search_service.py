@@ -0,0 +1,344 @@
+from app.models.template import Template
+from app.services.template_engine import PARAMETER_PATTERN
+from app import db
+from flask import current_app
+from sqlalchemy import and_, or_, text, bindparam, column
+from collections import namedtuple
+import html
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Words and @@parameter references in a search string
+SEARCH_TERM_PATTERN = re.compile(r'@@([A-Za-z][A-Za-z0-9_]*)|(\w+)', re.UNICODE)
+
+TAG_PATTERN = re.compile(r'<[^>]*>')
+
+SearchTerms = namedtuple('SearchTerms', ['words', 'parameters'])
+
+def parse_search_terms(value):
+    """
+    Split a search string into plain words and @@parameter names
+
+    Args:
+        value (str): Search string, e.g. 'quarterly risk @@ClientName'
+
+    Returns:
+        SearchTerms: Unique words and parameter names in order of appearance
+    """
+    words = []
+    parameters = []
+    for match in SEARCH_TERM_PATTERN.finditer(value or ''):
+        parameter, word = match.groups()
+        if parameter and parameter not in parameters:
+            parameters.append(parameter)
+        elif word and word not in words:
+            words.append(word)
+    return SearchTerms(tuple(words), tuple(parameters))
+
+def searchable_text(body):
+    """Visible text of an HTML body (tags dropped, entities decoded)"""
+    return html.unescape(TAG_PATTERN.sub(' ', body or ''))
+
+def template_parameters(subject, body):
+    """@@parameter names referenced by a template's subject or body"""
+    return sorted(set(PARAMETER_PATTERN.findall(subject or '')) | set(PARAMETER_PATTERN.findall(body or '')))
+
+class LikeSearchBackend:
+    """
+    Fallback search using case-insensitive substring matches
+
+    Used on databases without a full-text backend and while a full-text index
+    has not been built yet. Maintains no index of its own.
+    """
+
+    name = 'like'
+
+    def is_ready(self):
+        return True
+
+    def ensure_index(self):
+        """Create the search index if it is missing; returns True when created"""
+        return False
+
+    def rebuild(self, chunk_size=500):
+        """Re-index every template; returns the number of templates indexed"""
+        return 0
+
+    def index_template(self, template):
+        """Add or refresh a template in the index (runs in the caller's transaction)"""
+
+    def remove_template(self, template_id):
+        """Remove a template from the index (runs in the caller's transaction)"""
+
+    def condition(self, field_name, terms):
+        """
+        Build a predicate on Template matching all search terms in a field
+
+        Args:
+            field_name (str): 'Subject' or 'Body'
+            terms (SearchTerms): Parsed search terms
+
+        Returns:
+            SQLAlchemy condition
+        """
+        field = getattr(Template, field_name)
+        conditions = [field.icontains(word, autoescape=True) for word in terms.words]
+        conditions.extend(
+            or_(Template.Subject.contains(f'@@{name}', autoescape=True),
+                Template.Body.contains(f'@@{name}', autoescape=True))
+            for name in terms.parameters
+        )
+        return and_(*conditions)
+
+class SqliteFtsSearchBackend(LikeSearchBackend):
+    """
+    SQLite FTS5 index over template subjects, body text and @@parameter names
+
+    The index lives in the TemplateSearch virtual table and is written in the
+    same transaction as the template change.
+    """
+
+    name = 'sqlite_fts5'
+    TABLE = 'TemplateSearch'
+
+    def __init__(self):
+        self._ready = False
+
+    def is_ready(self):
+        if not self._ready:
+            self._ready = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': self.TABLE}
+            ).first() is not None
+        return self._ready
+
+    def ensure_index(self):
+        if self.is_ready():
+            return False
+
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+            "TemplateId, Subject, Body, Parameters, tokenize = 'unicode61')"
+        ))
+        db.session.commit()
+        self._ready = True
+        self.rebuild()
+        return True
+
+    def rebuild(self, chunk_size=500):
+        db.session.execute(text(f"DELETE FROM {self.TABLE}"))
+
+        indexed = 0
+        chunk = []
+        rows = db.session.query(Template.EmailTemplateId, Template.Subject, Template.Body)\
+                         .yield_per(chunk_size)
+        for template_id, subject, body in rows:
+            chunk.append(self._document(template_id, subject, body))
+            if len(chunk) == chunk_size:
+                indexed += self._insert(chunk)
+                chunk = []
+        if chunk:
+            indexed += self._insert(chunk)
+
+        db.session.commit()
+        return indexed
+
+    def index_template(self, template):
+        self.remove_template(template.EmailTemplateId)
+        self._insert([self._document(template.EmailTemplateId, template.Subject, template.Body)])
+
+    def remove_template(self, template_id):
+        # Seek through the index on the id's tokens rather than scanning the table
+        db.session.execute(
+            text(f"DELETE FROM {self.TABLE} WHERE rowid IN ("
+                 f"SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH :key) "
+                 "AND TemplateId = :template_id"),
+            {'key': f'TemplateId : {self._phrase(template_id)}', 'template_id': template_id}
+        )
+
+    def condition(self, field_name, terms):
+        clauses = [f'{field_name} : {self._phrase(word)}*' for word in terms.words]
+        clauses.extend(f'Parameters : {self._phrase(name)}' for name in terms.parameters)
+
+        matches = text(f"SELECT TemplateId FROM {self.TABLE} WHERE {self.TABLE} MATCH :search")\
+            .bindparams(bindparam('search', ' AND '.join(clauses), unique=True))\
+            .columns(column('TemplateId'))
+        return Template.EmailTemplateId.in_(matches)
+
+    def _insert(self, documents):
+        db.session.execute(
+            text(f"INSERT INTO {self.TABLE} (TemplateId, Subject, Body, Parameters) "
+                 "VALUES (:template_id, :subject, :body, :parameters)"),
+            documents
+        )
+        return len(documents)
+
+    @staticmethod
+    def _document(template_id, subject, body):
+        return {
+            'template_id': template_id,
+            'subject': subject or '',
+            'body': searchable_text(body),
+            'parameters': ' '.join(template_parameters(subject, body))
+        }
+
+    @staticmethod
+    def _phrase(value):
+        return '"' + value.replace('"', '""') + '"'
+
+class SqlServerFullTextSearchBackend(LikeSearchBackend):
+    """
+    SQL Server full-text index on Templates(Subject, Body)
+
+    SQL Server maintains the index itself (CHANGE_TRACKING AUTO), so template
+    writes need no extra work here. @@parameter names are matched as words.
+    """
+
+    name = 'mssql_fulltext'
+    CATALOG = 'EmailDrafterCatalog'
+
+    def __init__(self):
+        self._ready = False
+
+    def is_ready(self):
+        if not self._ready:
+            self._ready = db.session.execute(text(
+                "SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Templates')"
+            )).first() is not None
+        return self._ready
+
+    def ensure_index(self):
+        if self.is_ready():
+            return False
+
+        # Full-text DDL cannot run inside a user transaction
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            key_index = connection.execute(text(
+                "SELECT name FROM sys.indexes "
+                "WHERE object_id = OBJECT_ID('Templates') AND is_primary_key = 1"
+            )).scalar()
+            connection.execute(text(
+                f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = '{self.CATALOG}') "
+                f"CREATE FULLTEXT CATALOG {self.CATALOG}"
+            ))
+            connection.execute(text(
+                f"CREATE FULLTEXT INDEX ON Templates (Subject, Body) KEY INDEX [{key_index}] "
+                f"ON {self.CATALOG} WITH CHANGE_TRACKING AUTO"
+            ))
+
+        self._ready = True
+        return True
+
+    def rebuild(self, chunk_size=500):
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text("ALTER FULLTEXT INDEX ON Templates START FULL POPULATION"))
+        # Population runs asynchronously on the server
+        return Template.query.count()
+
+    def condition(self, field_name, terms):
+        words = [f'"{word}*"' for word in terms.words]
+        words.extend(f'"{name}"' for name in terms.parameters)
+
+        return text(f"CONTAINS(Templates.{field_name}, :search)")\
+            .bindparams(bindparam('search', ' AND '.join(words), unique=True))
+
+class SearchService:
+    """
+    Full-text search over template subjects and bodies
+
+    The backend is chosen per Flask application from SEARCH_BACKEND ('auto'
+    picks SQLite FTS5 or SQL Server full-text from the database dialect, and
+    LIKE scans elsewhere). Until the full-text index exists, searches fall
+    back to LIKE and index maintenance is skipped; `flask search-rebuild`
+    creates and fills it.
+    """
+
+    EXTENSION_KEY = 'template_search_backend'
+
+    # Template fields the 'search' operator applies to
+    SEARCHABLE_FIELDS = ('Subject', 'Body')
+
+    BACKENDS = {
+        'like': LikeSearchBackend,
+        'sqlite_fts5': SqliteFtsSearchBackend,
+        'mssql_fulltext': SqlServerFullTextSearchBackend
+    }
+
+    @staticmethod
+    def backend():
+        """Get the search backend for the current Flask application"""
+        backend = current_app.extensions.get(SearchService.EXTENSION_KEY)
+        if backend is None:
+            name = current_app.config.get('SEARCH_BACKEND', 'auto')
+            if name == 'auto':
+                name = {'sqlite': 'sqlite_fts5', 'mssql': 'mssql_fulltext'}.get(db.engine.dialect.name, 'like')
+            backend = current_app.extensions.setdefault(SearchService.EXTENSION_KEY, SearchService.BACKENDS[name]())
+        return backend
+
+    @staticmethod
+    def condition(field_name, value):
+        """
+        Build a predicate matching templates whose field contains every search term
+
+        Args:
+            field_name (str): 'Subject' or 'Body'
+            value (str): Search string; @@Name terms match templates referencing that parameter
+
+        Returns:
+            SQLAlchemy condition, or None if the search string has no terms
+        """
+        terms = parse_search_terms(value)
+        if not terms.words and not terms.parameters:
+            return None
+
+        backend = SearchService.backend()
+        if not backend.is_ready():
+            backend = LikeSearchBackend()
+        return backend.condition(field_name, terms)
+
+    @staticmethod
+    def is_index_ready():
+        """Whether searches use the full-text index (rather than the LIKE fallback)"""
+        return SearchService.backend().is_ready()
+
+    @staticmethod
+    def index_template(template):
+        """Index a created or updated template (call before committing the change)"""
+        backend = SearchService.backend()
+        if backend.is_ready():
+            backend.index_template(template)
+
+    @staticmethod
+    def remove_template(template_id):
+        """Remove a deleted template from the index (call before committing the delete)"""
+        backend = SearchService.backend()
+        if backend.is_ready():
+            backend.remove_template(template_id)
+
+    @staticmethod
+    def ensure_index():
+        """
+        Create the search index if it is missing (populating it from Templates)
+
+        Returns:
+            bool: True if the index was created
+        """
+        created = SearchService.backend().ensure_index()
+        if created:
+            logger.info(f"Created {SearchService.backend().name} template search index")
+        return created
+
+    @staticmethod
+    def rebuild():
+        """
+        Create the search index if needed and re-index every template
+
+        Returns:
+            int: Number of templates indexed
+        """
+        backend = SearchService.backend()
+        if backend.ensure_index():
+            return Template.query.count()
+        return backend.rebuild()
@@ -0,0 +1,107 @@
+from app.utils.cache import LRUCache
+import re
+
+PARAMETER_PATTERN = re.compile(r'@@([A-Za-z][A-Za-z0-9_]*)')
+
+class CompiledTemplate:
+    """
+    Template text tokenized once into literal segments and @@parameter slots
+
+    Rendering fills the slots from a dictionary of already formatted values and
+    joins the parts in a single pass, so the cost is O(len(text)) regardless of
+    how many parameters the text references.
+    """
+
+    __slots__ = ('parts', 'slots', 'parameters')
+
+    def __init__(self, text):
+        parts = []
+        slots = []
+        position = 0
+
+        for match in PARAMETER_PATTERN.finditer(text or ''):
+            if match.start() > position:
+                parts.append(text[position:match.start()])
+            # Keep the original placeholder so unresolved parameters render unchanged
+            slots.append((len(parts), match.group(1)))
+            parts.append(match.group(0))
+            position = match.end()
+
+        if text and position < len(text):
+            parts.append(text[position:])
+
+        self.parts = tuple(parts)
+        self.slots = tuple(slots)
+        # Unique parameter names in order of first appearance
+        self.parameters = tuple(dict.fromkeys(name for _, name in slots))
+
+    def render(self, values):
+        """
+        Render the template
+
+        Args:
+            values (dict): Parameter names to formatted string values; parameters
+                without a value keep their @@placeholder
+
+        Returns:
+            str: Rendered text
+        """
+        if not self.slots:
+            return ''.join(self.parts)
+
+        parts = list(self.parts)
+        for index, name in self.slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = value
+
+        return ''.join(parts)
+
+class CompiledEmailTemplate:
+    """Compiled subject and body of a stored Template"""
+
+    __slots__ = ('subject', 'body')
+
+    def __init__(self, subject, body):
+        self.subject = subject
+        self.body = body
+
+class TemplateEngine:
+    """Compiles template text and caches compiled Templates per EmailTemplateId + ModifiedTime"""
+
+    _cache = LRUCache(maxsize=512)
+
+    @staticmethod
+    def compile(text):
+        """Compile arbitrary template text (not cached)"""
+        return CompiledTemplate(text)
+
+    @classmethod
+    def compile_template(cls, template):
+        """
+        Get the compiled subject and body for a Template, compiling on first use
+
+        Args:
+            template: Template model instance
+
+        Returns:
+            CompiledEmailTemplate: Cached compiled form of the template
+        """
+        entry = cls._cache.get(template.EmailTemplateId)
+        if entry is not None and entry[0] == template.ModifiedTime:
+            return entry[1]
+
+        compiled = CompiledEmailTemplate(
+            CompiledTemplate(template.Subject),
+            CompiledTemplate(template.Body)
+        )
+        cls._cache.set(template.EmailTemplateId, (template.ModifiedTime, compiled))
+        return compiled
+
+    @classmethod
+    def invalidate(cls, template_id=None):
+        """Drop the compiled form of one template, or of all templates"""
+        if template_id is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(template_id)
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+import threading
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache shared across request threads"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it as recently used) or default"""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key from the cache and return its value"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
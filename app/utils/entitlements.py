@@ -0,0 +1,93 @@
+from flask import g, request
+from functools import lru_cache
+
+ADMIN_ENTITLEMENT = 'EmailDrafter>admin>true'
+
+class Entitlements:
+    """
+    Compiled view of a user's entitlement strings
+
+    Entitlements of the form 'EmailDrafter>templates_{APP}_{permission}>true'
+    are parsed once into per-permission frozensets of upper-cased application
+    names, plus an admin flag. Instances are immutable and shared between
+    requests carrying the same X-User-Entitlements header. They still behave
+    like the original list of strings (iteration, membership, truthiness).
+    """
+
+    __slots__ = ('raw', 'is_admin', 'permissions')
+
+    def __init__(self, entitlements=()):
+        self.raw = tuple(entitlement for entitlement in entitlements if isinstance(entitlement, str))
+        self.is_admin = ADMIN_ENTITLEMENT in self.raw
+        self.permissions = _index_permissions(self.raw)
+
+    @staticmethod
+    def from_header(header_value):
+        """Build (or reuse) the Entitlements for a raw X-User-Entitlements header value"""
+        return _entitlements_from_header(header_value or '')
+
+    @staticmethod
+    def coerce(entitlements):
+        """Accept an Entitlements object or a list of entitlement strings"""
+        if isinstance(entitlements, Entitlements):
+            return entitlements
+        return _entitlements_from_tuple(tuple(entitlements or ()))
+
+    def applications(self, permission_type='read'):
+        """Upper-cased application names granted for a permission type"""
+        return self.permissions.get(permission_type, frozenset())
+
+    def __contains__(self, entitlement):
+        return entitlement in self.raw
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __repr__(self):
+        return f'Entitlements({list(self.raw)!r})'
+
+def _index_permissions(entitlements):
+    """Index entitlement strings by permission type"""
+    index = {}
+
+    for entitlement in entitlements:
+        parts = entitlement.split('>')
+        if len(parts) >= 3 and parts[0] == 'EmailDrafter' and parts[2] == 'true':
+            permission_part = parts[1]
+            if permission_part.startswith('templates_'):
+                # Split off the trailing '_{permission}'
+                app_name, separator, permission_type = permission_part[10:].rpartition('_')
+                if separator and app_name and permission_type:
+                    index.setdefault(permission_type, set()).add(app_name.upper())
+
+    return {permission_type: frozenset(apps) for permission_type, apps in index.items()}
+
+@lru_cache(maxsize=1024)
+def _entitlements_from_header(header_value):
+    return Entitlements(
+        entitlement.strip() for entitlement in header_value.split(',') if entitlement.strip()
+    )
+
+@lru_cache(maxsize=1024)
+def _entitlements_from_tuple(entitlements):
+    return Entitlements(entitlements)
+
+def load_request_entitlements():
+    """before_request hook: attach the caller's compiled entitlements to flask.g"""
+    g.entitlements = Entitlements.from_header(request.headers.get('X-User-Entitlements'))
+
+def get_user_entitlements():
+    """
+    Get the current user's entitlements
+
+    Extracted from the X-User-Entitlements request header; this should be
+    replaced by claims from your authentication system.
+    """
+    entitlements = g.get('entitlements')
+    if entitlements is None:
+        load_request_entitlements()
+        entitlements = g.entitlements
+    return entitlements
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Graph client assertion creation
+
+Compares building the RS256 client assertion when the certificate private key
+is parsed from disk on every call (the previous behaviour) against reusing the
+key held by the private key cache. A throwaway password-protected RSA key is
+generated, so no Azure configuration is needed.
+
+Usage: python benchmark_client_assertion.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app import create_app
+from app.services.graph_auth import private_key_cache
+from app.services.outlook_service import OutlookService
+from config import Config
+
+def write_test_key(path, password):
+    """Write a password-protected 2048-bit RSA key in PEM format"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, 'wb') as key_file:
+        key_file.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.BestAvailableEncryption(password.encode())
+        ))
+
+def time_assertions(iterations, clear_cache):
+    """Return average milliseconds per client assertion"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if clear_cache:
+            private_key_cache.clear()
+        OutlookService._create_client_assertion()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def run_benchmark(iterations):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        key_path = os.path.join(tmp_dir, 'benchmark_key.pem')
+        write_test_key(key_path, 'benchmark-password')
+
+        class BenchmarkConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite://'
+            AZURE_TENANT_ID = 'benchmark-tenant'
+            AZURE_CLIENT_ID = 'benchmark-client'
+            AZURE_CERT_PATH = key_path
+            AZURE_CERT_PASSWORD = 'benchmark-password'
+            AZURE_CERT_THUMBPRINT = 'benchmark-thumbprint'
+
+        app = create_app(BenchmarkConfig)
+
+        with app.app_context():
+            # Warm up imports and the signing path
+            OutlookService._create_client_assertion()
+
+            uncached_ms = time_assertions(iterations, clear_cache=True)
+            cached_ms = time_assertions(iterations, clear_cache=False)
+
+    print(f"Client assertion creation ({iterations} iterations)")
+    print(f"  key parsed every call: {uncached_ms:8.3f} ms/op")
+    print(f"  cached private key:    {cached_ms:8.3f} ms/op")
+    print(f"  speedup:               {uncached_ms / cached_ms:8.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
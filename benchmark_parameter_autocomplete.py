@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for parameter autocomplete
+
+Compares the previous per-keystroke database query (ParameterName ILIKE
+'%term%' ordered by name, LIMIT 10) against the in-memory ParameterAutocomplete
+index. A throwaway in-memory SQLite database is filled with synthetic
+parameter names, and every prefix of a set of sample names is searched, as a
+user typing would. Latencies are reported as p50 / p99 / max.
+
+Usage: python benchmark_parameter_autocomplete.py [parameter_count] [rounds]
+"""
+
+import random
+import sys
+import time
+
+from app import create_app, db
+from app.models.parameter import Parameter
+from app.services.parameter_autocomplete import ParameterAutocomplete
+from config import Config
+
+WORDS = [
+    'Client', 'Account', 'Trade', 'Risk', 'Limit', 'Exposure', 'Desk', 'Book', 'Counterparty',
+    'Settlement', 'Date', 'Amount', 'Currency', 'Notional', 'Rating', 'Region', 'Country',
+    'Manager', 'Email', 'Name', 'Id', 'Code', 'Status', 'Threshold', 'Breach', 'Report',
+    'Portfolio', 'Instrument', 'Maturity', 'Price', 'Spread', 'Margin', 'Collateral', 'Entity'
+]
+
+def parameter_names(count, rng):
+    """Generate count unique CamelCase / snake_case parameter names"""
+    names = set()
+    while len(names) < count:
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        separator = '_' if rng.random() < 0.3 else ''
+        names.add(separator.join(words) + (str(rng.randint(1, 99)) if rng.random() < 0.5 else ''))
+    return sorted(names)
+
+def search_terms(names, rng, samples=50):
+    """Every prefix of some names plus inner fragments of others (what a typing user sends)"""
+    terms = []
+    for name in rng.sample(names, samples):
+        terms.extend(name[:length] for length in range(1, min(len(name), 12) + 1))
+    for name in rng.sample(names, samples):
+        start = rng.randint(1, max(1, len(name) - 4))
+        terms.append(name[start:start + rng.randint(3, 6)])
+    return terms
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    pick = lambda fraction: ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return pick(0.50), pick(0.99), ordered[-1]
+
+def time_searches(search, terms, rounds):
+    """Return per-search latencies in milliseconds"""
+    latencies = []
+    for _ in range(rounds):
+        for term in terms:
+            start = time.perf_counter()
+            search(term)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def database_search(term):
+    """The previous implementation: one ILIKE query per keystroke"""
+    return Parameter.query.filter_by(IsActive=True)\
+                          .filter(Parameter.ParameterName.ilike(f'%{term}%'))\
+                          .order_by(Parameter.ParameterName)\
+                          .limit(10)\
+                          .all()
+
+def run_benchmark(parameter_count, rounds):
+    rng = random.Random(42)
+    names = parameter_names(parameter_count, rng)
+    terms = search_terms(names, rng)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+    app = create_app(BenchmarkConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            Parameter(ParameterName=name, DataType='String', Description=f'{name} value', CreatedBy='benchmark')
+            for name in names
+        )
+        db.session.commit()
+
+        autocomplete = ParameterAutocomplete.current()
+        start = time.perf_counter()
+        autocomplete.index()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        database_ms = percentiles(time_searches(database_search, terms, rounds))
+        index_ms = percentiles(time_searches(autocomplete.search, terms, rounds))
+
+    print(f"Parameter autocomplete ({parameter_count} parameters, {len(terms) * rounds} searches)")
+    print(f"  index build (incl. registry load): {build_ms:8.1f} ms")
+    print(f"  {'':22} {'p50':>9} {'p99':>9} {'max':>9}")
+    print(f"  {'database ILIKE query':22} " + ' '.join(f'{value:7.3f}ms' for value in database_ms))
+    print(f"  {'in-memory index':22} " + ' '.join(f'{value:7.3f}ms' for value in index_ms))
+    print(f"  p99 speedup: {database_ms[1] / index_ms[1]:8.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    )
@@ -64,6 +64,71 @@ class Config:
     AZURE_CERT_PATH = os.environ.get('AZURE_CERT_PATH')  # Path to .pem certificate file
     AZURE_CERT_PASSWORD = os.environ.get('AZURE_CERT_PASSWORD')  # Certificate password if any
     AZURE_CERT_THUMBPRINT = os.environ.get('AZURE_CERT_THUMBPRINT')  # Certificate thumbprint
+    AZURE_AUTHORITY_HOST = os.environ.get('AZURE_AUTHORITY_HOST', 'https://login.microsoftonline.com')  # Override to point at a local token endpoint
+    
+    # Microsoft Graph HTTP settings (base URL can point at a local stub server)
+    GRAPH_API_BASE_URL = os.environ.get('GRAPH_API_BASE_URL', 'https://graph.microsoft.com/v1.0')
+    GRAPH_HTTP_POOL_SIZE = int(os.environ.get('GRAPH_HTTP_POOL_SIZE', '20'))
+    GRAPH_HTTP_CONNECT_TIMEOUT = float(os.environ.get('GRAPH_HTTP_CONNECT_TIMEOUT', '5'))
+    GRAPH_HTTP_READ_TIMEOUT = float(os.environ.get('GRAPH_HTTP_READ_TIMEOUT', '30'))
+    GRAPH_HTTP_MAX_RETRIES = int(os.environ.get('GRAPH_HTTP_MAX_RETRIES', '3'))
+    GRAPH_HTTP_BACKOFF_FACTOR = float(os.environ.get('GRAPH_HTTP_BACKOFF_FACTOR', '0.5'))
+    
+    GRAPH_BATCH_SIZE = int(os.environ.get('GRAPH_BATCH_SIZE', '20'))  # Sub-requests per $batch call (Graph allows at most 20)
+    GRAPH_MAX_RETRY_AFTER_SECONDS = float(os.environ.get('GRAPH_MAX_RETRY_AFTER_SECONDS', '10'))  # Longest Retry-After waited on for throttled $batch sub-requests
+    
+    # Graph access token caching: refresh in the background this many seconds before expiry,
+    # and stop handing out a token this many seconds before it actually expires
+    GRAPH_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get('GRAPH_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+    GRAPH_TOKEN_EXPIRY_SKEW_SECONDS = int(os.environ.get('GRAPH_TOKEN_EXPIRY_SKEW_SECONDS', '60'))
+    
+    # Seconds the in-process parameter registry is served before re-checking the Parameters table
+    PARAMETER_REGISTRY_TTL_SECONDS = int(os.environ.get('PARAMETER_REGISTRY_TTL_SECONDS', '60'))
+    
+    # Seconds the active application list is cached per process (writes through the API invalidate it immediately)
+    ACTIVE_APPLICATIONS_TTL_SECONDS = int(os.environ.get('ACTIVE_APPLICATIONS_TTL_SECONDS', '30'))
+    
+    # Row count at which 'estimate' totals on template queries stop counting
+    QUERY_TOTAL_ESTIMATE_CAP = int(os.environ.get('QUERY_TOTAL_ESTIMATE_CAP', '10000'))
+    
+    # Template count cache: seconds a count is trusted, seconds a stale count may still be
+    # served as an estimate, and the number of distinct filter sets kept
+    QUERY_COUNT_CACHE_TTL_SECONDS = int(os.environ.get('QUERY_COUNT_CACHE_TTL_SECONDS', '30'))
+    QUERY_COUNT_STALE_SECONDS = int(os.environ.get('QUERY_COUNT_STALE_SECONDS', '300'))
+    QUERY_COUNT_CACHE_SIZE = int(os.environ.get('QUERY_COUNT_CACHE_SIZE', '1024'))
+    
+    # Number of distinct filter sets whose compiled predicates are cached per process
+    QUERY_FILTER_PLAN_CACHE_SIZE = int(os.environ.get('QUERY_FILTER_PLAN_CACHE_SIZE', '512'))
+    
+    # Form configuration snapshots: seconds a snapshot is served before reloading (bounds
+    # staleness from writes by other processes) and the number of applications kept
+    FORM_CONFIG_CACHE_TTL_SECONDS = int(os.environ.get('FORM_CONFIG_CACHE_TTL_SECONDS', '60'))
+    FORM_CONFIG_CACHE_SIZE = int(os.environ.get('FORM_CONFIG_CACHE_SIZE', '256'))
+    
+    # Fields with more active options than this are served as OptionSource 'remote' and
+    # paged through /api/form-fields/configuration/<config_id>/options instead of inlined
+    FORM_FIELD_INLINE_OPTION_LIMIT = int(os.environ.get('FORM_FIELD_INLINE_OPTION_LIMIT', '200'))
+    
+    # Template search backend: 'auto' (SQLite FTS5 / SQL Server full-text by dialect), 'sqlite_fts5',
+    # 'mssql_fulltext' or 'like'
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    
+    # Rows fetched per database round trip by streaming template exports
+    QUERY_EXPORT_CHUNK_SIZE = int(os.environ.get('QUERY_EXPORT_CHUNK_SIZE', '1000'))
+    
+    # Maximum number of rows accepted by the mail-merge batch endpoint
+    MAIL_MERGE_MAX_ROWS = int(os.environ.get('MAIL_MERGE_MAX_ROWS', '25000'))
+    # Larger mail merges are queued in the outbox instead of calling Graph within the request
+    MAIL_MERGE_SYNC_MAX_ROWS = int(os.environ.get('MAIL_MERGE_SYNC_MAX_ROWS', '100'))
+    
+    # Asynchronous email outbox (drained by `flask outbox-worker` or in-process when autostarted)
+    OUTBOX_WORKERS_AUTOSTART = os.environ.get('OUTBOX_WORKERS_AUTOSTART', 'false').lower() == 'true'
+    OUTBOX_WORKERS = int(os.environ.get('OUTBOX_WORKERS', '4'))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '20'))
+    OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_POLL_INTERVAL_SECONDS', '2'))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '3'))
+    OUTBOX_RETRY_DELAY_SECONDS = int(os.environ.get('OUTBOX_RETRY_DELAY_SECONDS', '60'))
+    OUTBOX_VISIBILITY_TIMEOUT_SECONDS = int(os.environ.get('OUTBOX_VISIBILITY_TIMEOUT_SECONDS', '300'))
     
     # CORS settings
     CORS_ORIGINS = ['http://localhost:3000', 'https://your-frontend-domain.com']
\ No newline at end of file
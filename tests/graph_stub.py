@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.graph_http import GraphHttp
+
+TENANT_ID = 'test-tenant'
+CLIENT_ID = 'test-client'
+TOKEN_PATH = f'/{TENANT_ID}/oauth2/v2.0/token'
+
+class StubRequest:
+    """One request received by the stub server"""
+
+    def __init__(self, method, path, headers, body, client_port):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.client_port = client_port
+
+    def json(self):
+        return json.loads(self.body)
+
+    def form(self):
+        return {key: values[0] for key, values in parse_qs(self.body.decode()).items()}
+
+class StubGraphServer:
+    """
+    Local HTTP server standing in for the Entra token endpoint and Microsoft Graph
+
+    Handlers are registered per (method, path) and return (status, JSON body)
+    or (status, JSON body, headers). Every request is recorded in requests.
+    The server speaks HTTP/1.1 keep-alive, so connection reuse is observable
+    through each request's client_port.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._token_number = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                self._dispatch()
+
+            def _dispatch(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = StubRequest(self.command, self.path, dict(self.headers),
+                                      self.rfile.read(length), self.client_address[1])
+                with server._lock:
+                    server.requests.append(request)
+
+                handler = server._handlers.get((self.command, self.path))
+                if handler is None:
+                    status, body, headers = 404, {'error': {'code': 'NotFound', 'message': self.path}}, {}
+                else:
+                    status, body, *rest = handler(request)
+                    headers = rest[0] if rest else {}
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def route(self, method, path, handler):
+        """Register handler(request) for a method and path"""
+        self._handlers[(method, path)] = handler
+
+    def issue_tokens(self, expires_in=3600):
+        """Serve the token endpoint, issuing token-1, token-2, ... in turn"""
+        def handler(request):
+            with self._lock:
+                self._token_number += 1
+                number = self._token_number
+            return 200, {'token_type': 'Bearer', 'expires_in': expires_in, 'access_token': f'token-{number}'}
+
+        self.route('POST', TOKEN_PATH, handler)
+
+    def received(self, method, path):
+        """Requests received for a method and path, in arrival order"""
+        with self._lock:
+            return [request for request in self.requests if (request.method, request.path) == (method, path)]
+
+def write_private_key(directory):
+    """Write a fresh RSA private key for client assertions; returns (path, public key)"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, 'graph-test-key.pem')
+    with open(path, 'wb') as key_file:
+        key_file.write(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return path, private_key.public_key()
+
+def graph_test_config(server, cert_path, **overrides):
+    """Config class pointing the Graph and token endpoints at a stub server"""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'JWT_SECRET_KEY': 'test',
+        'CORS_ORIGINS': [],
+        'AZURE_TENANT_ID': TENANT_ID,
+        'AZURE_CLIENT_ID': CLIENT_ID,
+        'AZURE_CERT_PATH': cert_path,
+        'AZURE_CERT_THUMBPRINT': 'test-thumbprint',
+        'AZURE_AUTHORITY_HOST': server.url,
+        'GRAPH_API_BASE_URL': f'{server.url}/v1.0',
+        'GRAPH_HTTP_CONNECT_TIMEOUT': 2,
+        'GRAPH_HTTP_READ_TIMEOUT': 5,
+        'GRAPH_HTTP_BACKOFF_FACTOR': 0
+    }
+    settings.update(overrides)
+    return type('GraphTestConfig', (), settings)
+
+class GraphStubTestCase:
+    """
+    Mixin starting a stub server and an app whose Graph session points at it
+
+    The session is built by GraphHttp.build_session and put in place with
+    GraphHttp.install, so tests exercise the production pooling, retry and
+    timeout settings.
+    """
+
+    config_overrides = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.key_directory = tempfile.TemporaryDirectory()
+        cls.cert_path, cls.public_key = write_private_key(cls.key_directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.key_directory.cleanup()
+
+    def setUp(self):
+        from app import create_app
+
+        self.server = StubGraphServer().start()
+        self.app = create_app(graph_test_config(self.server, self.cert_path, **self.config_overrides))
+        self.context = self.app.app_context()
+        self.context.push()
+        GraphHttp.install(GraphHttp.build_session(self.app.config))
+
+    def tearDown(self):
+        GraphHttp.session().close()
+        self.context.pop()
+        self.server.stop()
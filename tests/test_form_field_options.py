@@ -0,0 +1,67 @@
+import unittest
+
+from app import create_app, db
+from app.models.application import Application
+from app.models.parameter import FormFieldConfiguration, FormFieldOption
+
+RDB_READ = 'EmailDrafter>templates_RDB_read>true'
+
+class TestConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'test'
+    CORS_ORIGINS = []
+
+class FormFieldOptionsEndpointTest(unittest.TestCase):
+    """GET /api/form-fields/configuration/<config_id>/options"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Application(ApplicationName='RDB', CreatedBy='test'))
+            for config_id, is_active in (('active', True), ('deleted', False)):
+                db.session.add(FormFieldConfiguration(
+                    ConfigId=config_id, ApplicationName='RDB', FieldName=f'{config_id}_field',
+                    FieldType='dropdown', FieldLabel='Field', IsActive=is_active, CreatedBy='test'
+                ))
+                for i in range(3):
+                    db.session.add(FormFieldOption(
+                        ConfigId=config_id, OptionValue=f'v{i}', OptionText=f'Option {i}', SortOrder=i
+                    ))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def options(self, config_id, **params):
+        return self.client.get(
+            f'/api/form-fields/configuration/{config_id}/options',
+            query_string=params,
+            headers={'X-User-Entitlements': RDB_READ}
+        )
+
+    def test_pages_active_configuration(self):
+        response = self.options('active', limit=2)
+
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        body = response.get_json()
+        self.assertEqual(len(body['options']), 2)
+        self.assertTrue(body['pagination']['has_more'])
+
+    def test_unknown_configuration_returns_404(self):
+        response = self.options('nope')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {'error': 'Configuration not found'})
+
+    def test_deactivated_configuration_returns_404(self):
+        response = self.options('deleted')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {'error': 'Configuration not found'})
+
+if __name__ == '__main__':
+    unittest.main()
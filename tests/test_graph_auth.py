@@ -0,0 +1,159 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import jwt
+
+from app.services.graph_auth import AccessTokenCache
+from app.services.outlook_service import OutlookService
+from graph_stub import CLIENT_ID, TOKEN_PATH, GraphStubTestCase
+
+class FakeClock:
+    """Stands in for time.monotonic in graph_auth"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class AccessTokenCacheTest(unittest.TestCase):
+    """AccessTokenCache expiry, background refresh, collapsing and invalidation"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('app.services.graph_auth.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = AccessTokenCache(refresh_margin=300, expiry_skew=60)
+        self.fetches = 0
+
+    def fetch(self):
+        self.fetches += 1
+        return f'token-{self.fetches}', 3600
+
+    def test_token_is_reused_until_expiry_skew(self):
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-1')
+
+        self.clock.now += 3600 - 301
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-1')
+        self.assertEqual(self.fetches, 1)
+
+        self.clock.now += 300
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-2')
+        self.assertEqual(self.fetches, 2)
+
+    def test_refresh_margin_refreshes_in_background(self):
+        self.cache.get_token(self.fetch)
+        self.clock.now += 3600 - 200
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return 'token-refreshed', 3600
+
+        # The caller gets the current token without waiting for the refresh
+        self.assertEqual(self.cache.get_token(slow_fetch), 'token-1')
+        self.assertTrue(started.wait(5))
+        # Only one refresh is started while it is in flight
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-1')
+        self.assertEqual(self.fetches, 1)
+
+        release.set()
+        with self.cache._refresh_lock:
+            pass
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-refreshed')
+
+    def test_failed_background_refresh_keeps_current_token(self):
+        self.cache.get_token(self.fetch)
+        self.clock.now += 3600 - 200
+
+        def failing_fetch():
+            raise RuntimeError('token endpoint down')
+
+        self.assertEqual(self.cache.get_token(failing_fetch), 'token-1')
+        with self.cache._refresh_lock:
+            pass
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-1')
+
+    def test_concurrent_callers_share_one_fetch(self):
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(5)
+            return self.fetch()
+
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(self.cache.get_token(slow_fetch))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(tokens, ['token-1'] * 8)
+        self.assertEqual(self.fetches, 1)
+
+    def test_invalidate_only_drops_the_rejected_token(self):
+        self.cache.get_token(self.fetch)
+
+        self.cache.invalidate('some-older-token')
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-1')
+
+        self.cache.invalidate('token-1')
+        self.assertEqual(self.cache.get_token(self.fetch), 'token-2')
+
+class TokenEndpointTest(GraphStubTestCase, unittest.TestCase):
+    """OutlookService token requests and 401 handling against the stub token endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.server.issue_tokens()
+
+    def test_token_request_signs_a_client_assertion(self):
+        self.assertEqual(OutlookService.get_access_token(), 'token-1')
+
+        [request] = self.server.received('POST', TOKEN_PATH)
+        form = request.form()
+        self.assertEqual((form['grant_type'], form['client_id']), ('client_credentials', CLIENT_ID))
+        claims = jwt.decode(form['client_assertion'], self.public_key, algorithms=['RS256'],
+                            audience=f'{self.server.url}{TOKEN_PATH}')
+        self.assertEqual(claims['iss'], CLIENT_ID)
+
+    def test_token_is_cached_across_calls(self):
+        self.assertEqual(OutlookService.get_access_token(), 'token-1')
+        self.assertEqual(OutlookService.get_access_token(), 'token-1')
+
+        self.assertEqual(len(self.server.received('POST', TOKEN_PATH)), 1)
+
+    def test_create_draft_refreshes_token_once_on_401(self):
+        def messages(request):
+            if request.headers['Authorization'] == 'Bearer token-1':
+                return 401, {'error': {'code': 'InvalidAuthenticationToken', 'message': 'expired'}}
+            return 201, {'id': 'draft-1', 'webLink': 'https://outlook/draft-1'}
+
+        self.server.route('POST', '/v1.0/users/sender@example.com/messages', messages)
+
+        result = OutlookService.create_draft('sender@example.com', 'Subject', 'Body', ['a@example.com'])
+
+        self.assertEqual(result['draftId'], 'draft-1')
+        self.assertEqual(len(self.server.received('POST', TOKEN_PATH)), 2)
+        self.assertEqual(OutlookService.get_access_token(), 'token-2')
+
+    def test_create_draft_gives_up_after_second_401(self):
+        self.server.route('POST', '/v1.0/users/sender@example.com/messages',
+                          lambda request: (401, {'error': {'code': 'InvalidAuthenticationToken'}}))
+
+        result = OutlookService.create_draft('sender@example.com', 'Subject', 'Body', ['a@example.com'])
+
+        self.assertFalse(result['success'])
+        self.assertIn('401', result['error'])
+        self.assertEqual(len(self.server.received('POST', '/v1.0/users/sender@example.com/messages')), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import time
+import unittest
+from unittest import mock
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from app.services.graph_http import GraphHttp, TimeoutSession
+from graph_stub import GraphStubTestCase
+
+class StubAdapter(BaseAdapter):
+    """Transport adapter that answers every request with 200 and records the send arguments"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request, kwargs))
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+class GraphHttpSettingsTest(unittest.TestCase):
+    """Session settings built from config, and replacing the session"""
+
+    config = {
+        'GRAPH_HTTP_MAX_RETRIES': 4,
+        'GRAPH_HTTP_BACKOFF_FACTOR': 0.25,
+        'GRAPH_HTTP_POOL_SIZE': 7,
+        'GRAPH_HTTP_CONNECT_TIMEOUT': 1.5,
+        'GRAPH_HTTP_READ_TIMEOUT': 12
+    }
+
+    def test_adapter_retry_and_pool_settings(self):
+        session = GraphHttp.build_session(self.config)
+
+        for prefix in ('https://', 'http://'):
+            adapter = session.get_adapter(f'{prefix}graph.microsoft.com')
+            self.assertIsInstance(adapter, HTTPAdapter)
+            retry = adapter.max_retries
+            self.assertEqual((retry.total, retry.connect, retry.status), (4, 4, 4))
+            # Requests that may have reached Graph are never replayed after a read failure
+            self.assertEqual(retry.read, 0)
+            self.assertEqual(set(retry.status_forcelist), {429, 503})
+            self.assertIn('POST', retry.allowed_methods)
+            self.assertTrue(retry.respect_retry_after_header)
+            self.assertFalse(retry.raise_on_status)
+            self.assertEqual(retry.backoff_factor, 0.25)
+            self.assertEqual(adapter._pool_maxsize, 7)
+
+        self.assertEqual(session.timeout, (1.5, 12))
+
+    def test_default_timeout_reaches_the_adapter(self):
+        session = TimeoutSession(timeout=(1.5, 12))
+        adapter = StubAdapter()
+        session.mount('https://', adapter)
+
+        session.get('https://graph.microsoft.com/v1.0/me')
+        session.get('https://graph.microsoft.com/v1.0/me', timeout=3)
+
+        self.assertEqual([kwargs['timeout'] for _, kwargs in adapter.sent], [(1.5, 12), 3])
+
+    def test_install_replaces_and_closes_the_session(self):
+        from app import create_app
+
+        app = create_app(type('Config', (), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+            'JWT_SECRET_KEY': 'test',
+            'CORS_ORIGINS': []
+        }))
+        with app.app_context():
+            previous = GraphHttp.session()
+            self.assertIs(GraphHttp.session(), previous)
+
+            stub = TimeoutSession(timeout=(1, 1))
+            adapter = StubAdapter()
+            stub.mount('https://', adapter)
+            with mock.patch.object(previous, 'close') as close:
+                GraphHttp.install(stub)
+
+            close.assert_called_once_with()
+            self.assertIs(GraphHttp.session(), stub)
+            GraphHttp.session().post(GraphHttp.graph_url('/$batch'), json={'requests': []})
+            self.assertEqual(adapter.sent[0][0].url, 'https://graph.microsoft.com/v1.0/$batch')
+
+class GraphHttpTransportTest(GraphStubTestCase, unittest.TestCase):
+    """Retries, timeouts and connection reuse against the stub server"""
+
+    config_overrides = {'GRAPH_HTTP_MAX_RETRIES': 2, 'GRAPH_HTTP_READ_TIMEOUT': 0.5}
+
+    def throttle(self, times, retry_after='0'):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) <= times:
+                return 429, {'error': {'code': 'TooManyRequests'}}, {'Retry-After': retry_after}
+            return 200, {'value': []}
+
+        self.server.route('GET', '/v1.0/users', handler)
+        return calls
+
+    def test_throttled_request_is_retried(self):
+        calls = self.throttle(2)
+
+        response = GraphHttp.session().get(GraphHttp.graph_url('/users'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 3)
+
+    def test_throttling_beyond_max_retries_returns_the_429(self):
+        calls = self.throttle(5)
+
+        response = GraphHttp.session().get(GraphHttp.graph_url('/users'))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(calls), 3)
+
+    def test_read_timeout_is_not_retried(self):
+        calls = []
+
+        def slow(request):
+            calls.append(request)
+            time.sleep(1.5)
+            return 201, {}
+
+        self.server.route('POST', '/v1.0/users/sender@example.com/sendMail', slow)
+
+        # With read retries disabled urllib3 gives up at once, which requests reports as a ConnectionError
+        with self.assertRaisesRegex(requests.exceptions.ConnectionError, 'Read timed out'):
+            GraphHttp.session().post(GraphHttp.graph_url('/users/sender@example.com/sendMail'), json={})
+        self.assertEqual(len(calls), 1)
+
+    def test_connections_are_reused(self):
+        self.server.route('GET', '/v1.0/me', lambda request: (200, {}))
+
+        for _ in range(3):
+            GraphHttp.session().get(GraphHttp.graph_url('/me'))
+
+        self.assertEqual(len({request.client_port for request in self.server.received('GET', '/v1.0/me')}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import io
+import unittest
+from unittest import mock
+
+from app import create_app, db
+from app.models.application import Application
+from app.models.email_generation_log import EmailGenerationLog
+from app.models.email_outbox import EmailOutbox
+from app.models.template import Template
+from app.routes.email_generation import _parse_mail_merge_request
+
+RDB_READ = 'EmailDrafter>templates_RDB_read>true'
+
+class TestConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'test'
+    CORS_ORIGINS = []
+    GRAPH_BATCH_SIZE = 2  # chunks of 10 rows
+    MAIL_MERGE_SYNC_MAX_ROWS = 30
+
+def drafts(messages):
+    return [{'success': True, 'draftId': f"draft-{message['recipients'][0]}"} for message in messages]
+
+class MailMergeTest(unittest.TestCase):
+    """POST /api/email/templates/<template_id>/generate/batch"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Application(ApplicationName='RDB', CreatedBy='test'))
+            template = Template(
+                ApplicationName='RDB', SsgTeam='alpha', RecipientType='internal', TemplateName='merge',
+                Sender='sender@example.com', Subject='Hello @@ClientName', Body='Body for @@ClientName',
+                CreatedBy='test'
+            )
+            db.session.add(template)
+            db.session.commit()
+            self.template_id = template.EmailTemplateId
+        self.client = self.app.test_client()
+        self.url = f'/api/email/templates/{self.template_id}/generate/batch'
+        self.headers = {'X-User-Entitlements': RDB_READ}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    @staticmethod
+    def rows(count):
+        return [{'recipients': [f'client{i}@example.com'], 'parameters': {'ClientName': f'Client {i}'}} for i in range(count)]
+
+    def count(self, model, **filters):
+        with self.app.app_context():
+            return model.query.filter_by(**filters).count()
+
+    def test_small_merge_is_sent_synchronously(self):
+        with mock.patch('app.routes.email_generation.OutlookService.create_drafts_batch', side_effect=drafts) as send:
+            response = self.client.post(self.url, json={'rows': self.rows(3)}, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        body = response.get_json()
+        self.assertEqual((body['async'], body['succeeded']), (False, 3))
+        [messages] = send.call_args.args
+        self.assertEqual(messages[1]['subject'], 'Hello Client 1')
+        self.assertEqual(self.count(EmailGenerationLog, Status='SUCCESS'), 3)
+
+    def test_each_chunk_is_committed_before_the_next(self):
+        calls = []
+
+        def send(messages):
+            calls.append(len(messages))
+            if len(calls) == 3:
+                raise RuntimeError('Graph unavailable')
+            return drafts(messages)
+
+        with mock.patch('app.routes.email_generation.OutlookService.create_drafts_batch', side_effect=send):
+            response = self.client.post(self.url, json={'rows': self.rows(25)}, headers=self.headers)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(calls, [10, 10, 5])
+        # The first two chunks' drafts exist in Outlook, so their logs survive the failure
+        self.assertEqual(self.count(EmailGenerationLog, Status='SUCCESS'), 20)
+
+    def test_large_merge_is_queued_in_the_outbox(self):
+        with mock.patch('app.routes.email_generation.OutlookService.create_drafts_batch') as send:
+            response = self.client.post(self.url, json={'rows': self.rows(31), 'async': False}, headers=self.headers)
+
+        self.assertEqual(response.status_code, 202, response.get_data(as_text=True))
+        body = response.get_json()
+        self.assertTrue(body['async'])
+        self.assertEqual({result['status'] for result in body['results']}, {'PENDING'})
+        send.assert_not_called()
+        self.assertEqual(self.count(EmailOutbox, Status='PENDING'), 31)
+        self.assertEqual(self.count(EmailGenerationLog, Status='PENDING'), 31)
+
+    def test_csv_upload(self):
+        csv_file = (
+            '\ufeffRecipients,ClientName,Region\r\n'
+            'a@example.com; b@example.com,Alice,EMEA\r\n'
+            'c@example.com,Carol,\r\n'
+        ).encode('utf-8')
+
+        with mock.patch('app.routes.email_generation.OutlookService.create_drafts_batch', side_effect=drafts) as send:
+            response = self.client.post(
+                self.url,
+                data={'file': (io.BytesIO(csv_file), 'rows.csv'), 'auto_send': 'false'},
+                headers=self.headers
+            )
+
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        [messages] = send.call_args.args
+        self.assertEqual([message['recipients'] for message in messages],
+                         [['a@example.com', 'b@example.com'], ['c@example.com']])
+        self.assertEqual([message['subject'] for message in messages], ['Hello Alice', 'Hello Carol'])
+
+class ParseMailMergeRequestTest(unittest.TestCase):
+    """_parse_mail_merge_request with JSON bodies and CSV uploads"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+
+    def parse(self, **request_kwargs):
+        with self.app.test_request_context('/', method='POST', **request_kwargs):
+            rows, options, error = _parse_mail_merge_request()
+            return rows, dict(options) if options is not None else None, error
+
+    def upload(self, text, **form):
+        return self.parse(data={'file': (io.BytesIO(text.encode('utf-8')), 'rows.csv'), **form})
+
+    def test_csv_rows_and_form_options(self):
+        rows, options, error = self.upload(
+            '\ufeff RECIPIENTS ,ClientName,Region\n'
+            'a@example.com;b@example.com,Alice,EMEA\n'
+            '"c@example.com, d@example.com",Carol,\n',
+            **{'async': 'true'}
+        )
+
+        self.assertIsNone(error)
+        self.assertEqual(rows, [
+            {'recipients': ['a@example.com', 'b@example.com'], 'parameters': {'ClientName': 'Alice', 'Region': 'EMEA'}},
+            # Empty cells are left out so parameter defaults apply
+            {'recipients': ['c@example.com', 'd@example.com'], 'parameters': {'ClientName': 'Carol'}}
+        ])
+        self.assertEqual(options['async'], 'true')
+
+    def test_csv_without_recipients_column(self):
+        self.assertEqual(self.upload('email,ClientName\na@example.com,Alice\n')[2],
+                         "CSV file must include a 'recipients' column")
+
+    def test_csv_without_rows(self):
+        self.assertEqual(self.upload('recipients,ClientName\n')[2], 'CSV file contains no rows')
+
+    def test_csv_that_is_not_utf8(self):
+        rows, options, error = self.parse(data={'file': (io.BytesIO(b'recipients\n\xff\xfe\n'), 'rows.csv')})
+
+        self.assertTrue(error.startswith('Invalid CSV file'))
+
+    def test_json_rows(self):
+        rows, options, error = self.parse(json={'rows': [{'recipients': ['a@example.com']}], 'async': True})
+
+        self.assertIsNone(error)
+        self.assertEqual(rows, [{'recipients': ['a@example.com']}])
+        self.assertTrue(options['async'])
+
+    def test_json_without_rows(self):
+        self.assertEqual(self.parse(json={'rows': []})[2], 'Rows list is required')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app import create_app, db
+from app.models.email_generation_log import EmailGenerationLog
+from app.models.email_outbox import EmailOutbox
+from app.models.template import Template
+from app.services.outbox_service import OutboxService
+
+class TestConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'test'
+    CORS_ORIGINS = []
+
+class OutboxServiceTest(unittest.TestCase):
+    """Claiming, retrying and failing outbox rows against an in-memory database"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.template = Template(
+            ApplicationName='RDB', SsgTeam='alpha', RecipientType='internal', TemplateName='t',
+            Sender='sender@example.com', Subject='Subject', Body='Body', CreatedBy='test'
+        )
+        db.session.add(self.template)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def enqueue(self, count=1, **outbox):
+        ids = []
+        for i in range(count):
+            log_entry = EmailGenerationLog(
+                EmailTemplateId=self.template.EmailTemplateId, GeneratedBy='test',
+                Recipients=json.dumps(['a@example.com']), Status='PENDING'
+            )
+            db.session.add(log_entry)
+            db.session.flush()
+            entry = OutboxService.enqueue(log_entry, 'sender@example.com', f'Subject {i}', 'Body', ['a@example.com'])
+            for key, value in outbox.items():
+                setattr(entry, key, value)
+            db.session.flush()
+            ids.append(entry.OutboxId)
+        db.session.commit()
+        return ids
+
+    @staticmethod
+    def row(outbox_id):
+        db.session.expire_all()
+        return db.session.get(EmailOutbox, outbox_id)
+
+    @staticmethod
+    def log(outbox_id):
+        return db.session.get(EmailGenerationLog, OutboxServiceTest.row(outbox_id).LogId)
+
+    def test_claim_takes_due_rows_once(self):
+        due = self.enqueue(2)
+        self.enqueue(1, AvailableAt=datetime.utcnow() + timedelta(minutes=5))
+
+        claimed = OutboxService.claim_batch(10)
+
+        self.assertCountEqual([entry.OutboxId for entry in claimed], due)
+        self.assertTrue(all(entry.Status == 'PROCESSING' and entry.ClaimToken for entry in claimed))
+        self.assertEqual(OutboxService.claim_batch(10), [])
+
+    def test_claim_respects_limit(self):
+        self.enqueue(3)
+
+        self.assertEqual(len(OutboxService.claim_batch(2)), 2)
+        self.assertEqual(len(OutboxService.claim_batch(2)), 1)
+
+    def test_stale_claim_is_reclaimed_as_an_attempt(self):
+        [outbox_id] = self.enqueue(1, Status='PROCESSING', ClaimToken='dead-worker',
+                                   ClaimedAt=datetime.utcnow() - timedelta(seconds=600))
+
+        claimed = OutboxService.claim_batch(10, visibility_timeout=300, max_attempts=3)
+
+        self.assertEqual([entry.OutboxId for entry in claimed], [outbox_id])
+        row = self.row(outbox_id)
+        self.assertEqual(row.Attempts, 1)
+        self.assertNotEqual(row.ClaimToken, 'dead-worker')
+
+    def test_fresh_claim_is_not_reclaimed(self):
+        self.enqueue(1, Status='PROCESSING', ClaimToken='busy-worker', ClaimedAt=datetime.utcnow())
+
+        self.assertEqual(OutboxService.claim_batch(10, visibility_timeout=300), [])
+
+    def test_stale_claim_fails_after_max_attempts(self):
+        [outbox_id] = self.enqueue(1, Status='PROCESSING', Attempts=2, ClaimToken='dead-worker',
+                                   ClaimedAt=datetime.utcnow() - timedelta(seconds=600))
+
+        self.assertEqual(OutboxService.claim_batch(10, visibility_timeout=300, max_attempts=3), [])
+
+        row = self.row(outbox_id)
+        self.assertEqual((row.Status, row.Attempts, row.ClaimToken), ('FAILED', 3, None))
+        self.assertIn('300 seconds', row.ErrorMessage)
+        self.assertEqual(self.log(outbox_id).Status, 'FAILED')
+        self.assertEqual(self.log(outbox_id).ErrorMessage, row.ErrorMessage)
+
+    def test_delivered_rows_are_removed(self):
+        [outbox_id] = self.enqueue(1)
+        log_id = self.row(outbox_id).LogId
+
+        with mock.patch('app.services.outbox_service.OutlookService.create_drafts_batch',
+                        return_value=[{'success': True, 'draftId': 'draft-1'}]):
+            self.assertEqual(OutboxService.process_batch(10), 1)
+
+        self.assertIsNone(self.row(outbox_id))
+        log_entry = db.session.get(EmailGenerationLog, log_id)
+        self.assertEqual((log_entry.Status, log_entry.OutlookDraftId), ('SUCCESS', 'draft-1'))
+
+    def test_failed_delivery_backs_off_then_fails(self):
+        [outbox_id] = self.enqueue(1)
+        failure = [{'success': False, 'error': 'Failed to create draft: 503'}]
+
+        with mock.patch('app.services.outbox_service.OutlookService.create_drafts_batch', return_value=failure):
+            before = datetime.utcnow()
+            OutboxService.process_batch(10, max_attempts=2, retry_delay=60)
+            row = self.row(outbox_id)
+            self.assertEqual((row.Status, row.Attempts, row.ClaimToken), ('PENDING', 1, None))
+            self.assertGreaterEqual(row.AvailableAt, before + timedelta(seconds=60))
+
+            # Not due yet, so nothing is claimed
+            self.assertEqual(OutboxService.process_batch(10, max_attempts=2, retry_delay=60), 0)
+
+            row.AvailableAt = datetime.utcnow() - timedelta(seconds=1)
+            db.session.commit()
+            OutboxService.process_batch(10, max_attempts=2, retry_delay=60)
+
+        row = self.row(outbox_id)
+        self.assertEqual((row.Status, row.Attempts), ('FAILED', 2))
+        self.assertEqual(row.ErrorMessage, 'Failed to create draft: 503')
+        self.assertEqual(self.log(outbox_id).Status, 'FAILED')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from unittest import mock
+
+from app.services.outlook_service import OutlookService
+from graph_stub import TOKEN_PATH, GraphStubTestCase
+
+BATCH_PATH = '/v1.0/$batch'
+
+class OutlookBatchTest(GraphStubTestCase, unittest.TestCase):
+    """create_drafts_batch against the stub Graph $batch endpoint"""
+
+    config_overrides = {'GRAPH_HTTP_MAX_RETRIES': 2, 'GRAPH_MAX_RETRY_AFTER_SECONDS': 10}
+
+    def setUp(self):
+        super().setUp()
+        self.server.issue_tokens()
+        patcher = mock.patch('app.services.outlook_service.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve_batch(self, respond):
+        """
+        Serve $batch with respond(envelope_number, token, sub_request_id) returning
+        a status or (status, headers); an envelope_number key of 'envelope' may
+        instead return a status for the whole envelope
+        """
+        envelopes = []
+
+        def handler(request):
+            envelopes.append(request)
+            number = len(envelopes)
+            token = request.headers['Authorization'].split(' ', 1)[1]
+
+            envelope_status = respond(number, token, 'envelope')
+            if envelope_status:
+                return envelope_status, {'error': {'code': 'InvalidAuthenticationToken'}}
+
+            responses = []
+            for sub_request in request.json()['requests']:
+                outcome = respond(number, token, sub_request['id'])
+                status, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+                body = {'id': f"draft-{sub_request['id']}"} if status == 201 else {'error': {'code': str(status)}}
+                responses.append({'id': sub_request['id'], 'status': status, 'headers': headers, 'body': body})
+            return 200, {'responses': responses}
+
+        self.server.route('POST', BATCH_PATH, handler)
+        return envelopes
+
+    @staticmethod
+    def messages(count):
+        return [{
+            'sender': 'sender@example.com',
+            'subject': f'Subject {i}',
+            'body': 'Body',
+            'recipients': ['a@example.com']
+        } for i in range(count)]
+
+    @staticmethod
+    def sub_request_ids(envelope):
+        return [sub_request['id'] for sub_request in envelope.json()['requests']]
+
+    def test_mixed_201_429_401_batch(self):
+        def respond(number, token, item):
+            if item == 'envelope':
+                return None
+            if number == 1:
+                return {'0': 201, '1': (429, {'Retry-After': '2'}), '2': 401}[item]
+            return 201
+
+        envelopes = self.serve_batch(respond)
+
+        results = OutlookService.create_drafts_batch(self.messages(3))
+
+        self.assertEqual([result['draftId'] for result in results], ['draft-0', 'draft-1', 'draft-2'])
+        self.assertEqual(len(envelopes), 2)
+        self.assertEqual(self.sub_request_ids(envelopes[1]), ['1', '2'])
+        self.assertEqual(envelopes[1].headers['Authorization'], 'Bearer token-2')
+        self.assertEqual(len(self.server.received('POST', TOKEN_PATH)), 2)
+        self.sleep.assert_called_once_with(2.0)
+
+    def test_envelope_401_reauthenticates_and_resends(self):
+        def respond(number, token, item):
+            if item == 'envelope':
+                return 401 if token == 'token-1' else None
+            return 201
+
+        envelopes = self.serve_batch(respond)
+
+        results = OutlookService.create_drafts_batch(self.messages(2))
+
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual([envelope.headers['Authorization'] for envelope in envelopes],
+                         ['Bearer token-1', 'Bearer token-2'])
+        self.sleep.assert_not_called()
+
+    def test_second_401_fails_the_sub_request(self):
+        envelopes = self.serve_batch(lambda number, token, item: None if item == 'envelope' else (201 if item == '0' else 401))
+
+        results = OutlookService.create_drafts_batch(self.messages(2))
+
+        self.assertTrue(results[0]['success'])
+        self.assertFalse(results[1]['success'])
+        self.assertIn('401', results[1]['error'])
+        self.assertEqual(len(envelopes), 2)
+        self.assertEqual(len(self.server.received('POST', TOKEN_PATH)), 2)
+
+    def test_retry_after_over_limit_fails_without_waiting(self):
+        def respond(number, token, item):
+            if item == 'envelope':
+                return None
+            return (429, {'Retry-After': '120'}) if item == '0' else 201
+
+        envelopes = self.serve_batch(respond)
+
+        results = OutlookService.create_drafts_batch(self.messages(2))
+
+        self.assertFalse(results[0]['success'])
+        self.assertIn('Retry-After 120s exceeds the 10s limit', results[0]['error'])
+        self.assertTrue(results[1]['success'])
+        self.assertEqual(len(envelopes), 1)
+        self.sleep.assert_not_called()
+
+    def test_throttling_gives_up_after_max_retries(self):
+        envelopes = self.serve_batch(lambda number, token, item: None if item == 'envelope' else (503, {'Retry-After': '1'}))
+
+        results = OutlookService.create_drafts_batch(self.messages(1))
+
+        self.assertFalse(results[0]['success'])
+        self.assertIn('503', results[0]['error'])
+        self.assertEqual(len(envelopes), 3)
+        self.assertEqual([call.args for call in self.sleep.call_args_list], [(1.0,), (1.0,)])
+
+    def test_messages_are_chunked_by_batch_size(self):
+        self.app.config['GRAPH_BATCH_SIZE'] = 2
+        envelopes = self.serve_batch(lambda number, token, item: None if item == 'envelope' else 201)
+
+        results = OutlookService.create_drafts_batch(self.messages(5))
+
+        self.assertEqual([result['draftId'] for result in results],
+                         ['draft-0', 'draft-1', 'draft-2', 'draft-3', 'draft-4'])
+        self.assertEqual([self.sub_request_ids(envelope) for envelope in envelopes], [['0', '1'], ['2', '3'], ['4']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from app import create_app, db
+from app.models.application import Application
+from app.models.template import Template
+
+RDB_READ = 'EmailDrafter>templates_RDB_read>true'
+OTHER_READ = 'EmailDrafter>templates_OTHER_read>true'
+
+class TestConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'test'
+    CORS_ORIGINS = []
+
+class QueryFacetsEndpointTest(unittest.TestCase):
+    """GET/POST /api/query/templates/facets through the HTTP layer"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            db.create_all()
+            for name in ('RDB', 'OTHER', 'HIDDEN'):
+                db.session.add(Application(ApplicationName=name, CreatedBy='test'))
+            for application, team, count in (('RDB', 'alpha', 3), ('RDB', 'beta', 1), ('OTHER', 'alpha', 2), ('HIDDEN', 'gamma', 5)):
+                for i in range(count):
+                    db.session.add(Template(
+                        ApplicationName=application, SsgTeam=team, RecipientType='internal',
+                        TemplateName=f'{application}-{team}-{i}', Sender='sender@example.com',
+                        Subject='Subject', Body='Body', CreatedBy='test'
+                    ))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def facets(self, entitlements, **params):
+        response = self.client.get(
+            '/api/query/templates/facets',
+            query_string=params,
+            headers={'X-User-Entitlements': ','.join(entitlements)}
+        )
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()['facets']
+
+    @staticmethod
+    def counts(facet):
+        return {entry['value']: entry['count'] for entry in facet['values']}
+
+    def test_facets_are_scoped_to_readable_applications(self):
+        facets = self.facets([RDB_READ, OTHER_READ], fields='application_name,ssg_team')
+
+        self.assertEqual(self.counts(facets['application_name']), {'RDB': 4, 'OTHER': 2})
+        self.assertEqual(self.counts(facets['ssg_team']), {'alpha': 5, 'beta': 1})
+
+    def test_single_application_entitlement(self):
+        facets = self.facets([RDB_READ], fields='ssg_team')
+
+        self.assertEqual(self.counts(facets['ssg_team']), {'alpha': 3, 'beta': 1})
+
+    def test_no_entitlements_returns_no_facet_values(self):
+        facets = self.facets([], fields='ssg_team')
+
+        self.assertEqual(facets['ssg_team']['values'], [])
+
+    def test_post_applies_filters(self):
+        response = self.client.post(
+            '/api/query/templates/facets',
+            json={'fields': ['ssg_team'], 'filters': [{'field': 'application_name', 'operator': 'eq', 'value': 'OTHER'}]},
+            headers={'X-User-Entitlements': f'{RDB_READ},{OTHER_READ}'}
+        )
+
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        self.assertEqual(self.counts(response.get_json()['facets']['ssg_team']), {'alpha': 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import unittest
+
+from app import create_app, db
+from app.models.application import Application
+from app.models.template import Template
+
+RDB_READ = 'EmailDrafter>templates_RDB_read>true'
+
+class TestConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'test'
+    CORS_ORIGINS = []
+
+class QueryFilterGroupsTest(unittest.TestCase):
+    """Nested filter groups through POST /api/query/templates"""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Application(ApplicationName='RDB', CreatedBy='test'))
+            for team, count in (('alpha', 3), ('beta', 2), ('gamma', 1)):
+                for i in range(count):
+                    db.session.add(Template(
+                        ApplicationName='RDB', SsgTeam=team, RecipientType='internal',
+                        TemplateName=f'{team}-{i}', Sender='sender@example.com',
+                        Subject='Subject', Body='Body', CreatedBy='test'
+                    ))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def query(self, filters):
+        return self.client.post(
+            '/api/query/templates',
+            json={'filters': filters, 'page_size': 200},
+            headers={'X-User-Entitlements': RDB_READ}
+        )
+
+    def teams(self, filters):
+        response = self.query(filters)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return sorted(row['SsgTeam'] for row in response.get_json()['data'])
+
+    def assertRejected(self, filters, message):
+        response = self.query(filters)
+        self.assertEqual(response.status_code, 400, response.get_data(as_text=True))
+        self.assertIn(message, response.get_json()['error'])
+
+    def test_valid_nested_groups(self):
+        filters = [{'or': [
+            {'field': 'ssg_team', 'value': 'gamma'},
+            {'not': {'field': 'ssg_team', 'operator': 'in', 'value': ['alpha', 'gamma']}}
+        ]}]
+
+        self.assertEqual(self.teams(filters), ['beta', 'beta', 'gamma'])
+
+    def test_not_with_scalar_in_value_is_rejected(self):
+        self.assertRejected(
+            [{'not': {'field': 'ssg_team', 'operator': 'in', 'value': 'alpha'}}],
+            "Filter 0.not: 'in' requires a list of values"
+        )
+
+    def test_or_member_with_scalar_in_value_is_rejected(self):
+        self.assertRejected(
+            [{'or': [
+                {'field': 'ssg_team', 'value': 'alpha'},
+                {'field': 'ssg_team', 'operator': 'in', 'value': 'beta'}
+            ]}],
+            "Filter 0.or[1]: 'in' requires a list of values"
+        )
+
+    def test_not_and_with_scalar_not_in_value_is_rejected(self):
+        self.assertRejected(
+            [{'not': {'and': [
+                {'field': 'ssg_team', 'value': 'alpha'},
+                {'field': 'ssg_team', 'operator': 'not_in', 'value': 'beta'}
+            ]}}],
+            "'not_in' requires a list of values"
+        )
+
+    def test_rejected_filters_on_count_and_export(self):
+        filters = [{'not': {'field': 'ssg_team', 'operator': 'in', 'value': 'alpha'}}]
+        headers = {'X-User-Entitlements': RDB_READ}
+
+        count = self.client.get('/api/query/templates/count', query_string={'filters': json.dumps(filters)}, headers=headers)
+        export = self.client.post('/api/query/templates/export?format=json', json={'filters': filters}, headers=headers)
+
+        self.assertEqual(count.status_code, 400)
+        self.assertEqual(export.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()